@@ -2,9 +2,14 @@
 Servicio de cache en memoria
 Implementa ICacheService aplicando principios SOLID
 """
+import heapq
+import itertools
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 
 from interfaces.repository_interface import ICacheService
 
@@ -21,9 +26,28 @@ class MemoryCacheService(ICacheService):
     - Interface Segregation: Implementa solo métodos de cache necesarios
     """
     
-    def __init__(self):
-        """Constructor del servicio de cache"""
-        self._cache: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, maxsize: int = 10_000):
+        """
+        Constructor del servicio de cache
+        
+        Args:
+            maxsize: Número máximo de elementos antes de desalojar el menos usado (LRU)
+        """
+        # Cada entrada es un par (expire_at, data); el orden refleja el uso (LRU)
+        self._cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._maxsize = maxsize
+        # Costo fijo de cada entrada (par expire_at/data), calculado una sola vez
+        self._entry_overhead = sys.getsizeof((0.0, None))
+        # Min-heap de (expire_at, key) para localizar expirados sin recorrer todo el cache
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # Protege toda modificación del cache (incluido el reordenamiento LRU de get)
+        self._lock = threading.RLock()
+        # Contadores acumulados para get_stats (aproximados bajo concurrencia)
+        self._sets = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
         logger.info("MemoryCacheService initialized")
     
     def get(self, key: str) -> Optional[Dict[str, Any]]:
@@ -36,39 +60,86 @@ class MemoryCacheService(ICacheService):
         Returns:
             Datos del cache o None si no existe o expiró
         """
-        if key not in self._cache:
+        entry = self._cache.get(key)
+        if entry is None:
+            self._misses += 1
             return None
         
-        item = self._cache[key]
-        expire_at = item.get("expire_at")
+        expire_at, data = entry
         
-        # Verificar si expiró
-        if expire_at and datetime.now().timestamp() > expire_at:
-            del self._cache[key]
-            logger.info(f"Cache item expired and removed: {key}")
-            return None
+        with self._lock:
+            # Verificar si expiró
+            if expire_at and time.monotonic() > expire_at:
+                # Solo se elimina si nadie la sobrescribió mientras tanto
+                if self._cache.get(key) is entry:
+                    del self._cache[key]
+                self._misses += 1
+                self._expirations += 1
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Cache item expired and removed: %s", key)
+                return None
+            
+            if key in self._cache:
+                self._cache.move_to_end(key)
+            self._hits += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cache hit: %s", key)
+        return data
+    
+    def peek(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene datos del cache sin moverlos en el orden LRU ni contar hit/miss
+        
+        Args:
+            key: Clave del cache
         
-        logger.info(f"Cache hit: {key}")
-        return item.get("data")
+        Returns:
+            Datos del cache o None si no existe o expiró
+        """
+        entry = self._cache.get(key)
+        if entry is None or time.monotonic() > entry[0]:
+            return None
+        return entry[1]
     
-    def set(self, key: str, data: Dict[str, Any], ttl_seconds: int = 3600) -> None:
+    def set(self, key: str, data: Dict[str, Any], ttl_seconds: int = 3600, *, copy_on_set: bool = False) -> None:
         """
         Guarda datos en cache con TTL
         
+        Los datos se guardan por referencia: quien llama no debe mutarlos
+        después de guardarlos, salvo que pida copy_on_set.
+        
         Args:
             key: Clave del cache
             data: Datos a guardar
             ttl_seconds: Tiempo de vida en segundos (default 1 hora)
+            copy_on_set: Si guardar una copia superficial del diccionario
         """
-        expire_at = (datetime.now() + timedelta(seconds=ttl_seconds)).timestamp()
+        expire_at = time.monotonic() + ttl_seconds
         
-        self._cache[key] = {
-            "data": data.copy() if isinstance(data, dict) else data,
-            "expire_at": expire_at,
-            "created_at": datetime.now().timestamp()
-        }
+        with self._lock:
+            self._cache[key] = (
+                expire_at,
+                data.copy() if copy_on_set and isinstance(data, dict) else data
+            )
+            self._cache.move_to_end(key)
+            self._sets += 1
+            
+            # Desalojar los elementos menos usados si se excede el tamaño máximo
+            while len(self._cache) > self._maxsize:
+                evicted_key, _ = self._cache.popitem(last=False)
+                self._evictions += 1
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Cache item evicted (LRU): %s", evicted_key)
+            
+            heapq.heappush(self._expiry_heap, (expire_at, key))
+            
+            # Reconstruir el heap si acumula demasiadas entradas obsoletas por sobrescrituras
+            if len(self._expiry_heap) > 2 * len(self._cache) + 64:
+                self._expiry_heap = [(entry[0], k) for k, entry in self._cache.items()]
+                heapq.heapify(self._expiry_heap)
         
-        logger.info(f"Cache item saved: {key} (TTL: {ttl_seconds}s)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cache item saved: %s (TTL: %ss)", key, ttl_seconds)
     
     def delete(self, key: str) -> None:
         """
@@ -77,42 +148,76 @@ class MemoryCacheService(ICacheService):
         Args:
             key: Clave del cache
         """
-        if key in self._cache:
-            del self._cache[key]
-            logger.info(f"Cache item deleted: {key}")
+        with self._lock:
+            removed = self._cache.pop(key, None) is not None
+        if removed and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cache item deleted: %s", key)
     
     def clear_all(self) -> None:
         """
         Limpia todo el cache
         """
-        cache_size = len(self._cache)
-        self._cache.clear()
+        with self._lock:
+            cache_size = len(self._cache)
+            self._cache.clear()
+            self._expiry_heap.clear()
         logger.info(f"Cache cleared - {cache_size} items removed")
     
     def get_stats(self) -> Dict[str, Any]:
         """
         Obtiene estadísticas del cache
         
+        No modifica el cache: los elementos expirados se cuentan pero no se
+        eliminan (para eso está cleanup_expired).
+        
         Returns:
             Diccionario con estadísticas
         """
-        now = datetime.now().timestamp()
-        active_items = 0
-        expired_items = 0
+        with self._lock:
+            total_items = len(self._cache)
+            expired_items = self._count_expired(time.monotonic())
+            
+            return {
+                "total_items": total_items,
+                "active_items": total_items - expired_items,
+                "expired_items": expired_items,
+                "sets": self._sets,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "memory_usage_estimate": self._estimate_memory_usage()
+            }
+    
+    def _count_expired(self, now: float) -> int:
+        """
+        Cuenta los elementos expirados sin recorrer todo el cache
         
-        for item in self._cache.values():
-            expire_at = item.get("expire_at")
-            if expire_at and now > expire_at:
-                expired_items += 1
-            else:
-                active_items += 1
+        Solo se visitan los nodos del heap ya expirados: si un nodo no expiró,
+        ninguno de sus hijos lo hizo. Cada nodo se compara con la entrada viva
+        para ignorar los obsoletos (clave sobrescrita o eliminada).
+        
+        Args:
+            now: Instante actual (time.monotonic())
         
-        return {
-            "total_items": len(self._cache),
-            "active_items": active_items,
-            "expired_items": expired_items,
-            "memory_usage_estimate": self._estimate_memory_usage()
-        }
+        Returns:
+            Número de elementos expirados aún presentes
+        """
+        heap = self._expiry_heap
+        expired = set()
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            expire_at, key = heap[i]
+            if expire_at > now:
+                continue
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] == expire_at:
+                expired.add(key)
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    stack.append(child)
+        return len(expired)
     
     def cleanup_expired(self) -> int:
         """
@@ -121,36 +226,44 @@ class MemoryCacheService(ICacheService):
         Returns:
             Número de elementos eliminados
         """
-        now = datetime.now().timestamp()
-        expired_keys = []
+        now = time.monotonic()
+        removed = 0
         
-        for key, item in self._cache.items():
-            expire_at = item.get("expire_at")
-            if expire_at and now > expire_at:
-                expired_keys.append(key)
+        with self._lock:
+            heap = self._expiry_heap
+            # Solo se visitan las entradas cuyo expire_at ya pasó
+            while heap and heap[0][0] <= now:
+                expire_at, key = heapq.heappop(heap)
+                entry = self._cache.get(key)
+                # Entradas obsoletas (clave sobrescrita o eliminada) se descartan sin más
+                if entry is not None and entry[0] == expire_at:
+                    self._cache.pop(key, None)
+                    removed += 1
+            self._expirations += removed
         
-        for key in expired_keys:
-            del self._cache[key]
+        if removed:
+            logger.info(f"Cleaned up {removed} expired cache items")
         
-        if expired_keys:
-            logger.info(f"Cleaned up {len(expired_keys)} expired cache items")
-        
-        return len(expired_keys)
+        return removed
     
     def _estimate_memory_usage(self) -> str:
         """
         Estima el uso de memoria del cache
         
+        Cada entrada cuenta un costo fijo precalculado más el tamaño medio
+        del payload, extrapolado de una muestra de hasta 32 elementos.
+        
         Returns:
             Estimación del uso de memoria como string
         """
         try:
-            import sys
-            total_size = sys.getsizeof(self._cache)
+            n = len(self._cache)
+            if n == 0:
+                return "0 bytes"
             
-            for item in self._cache.values():
-                total_size += sys.getsizeof(item)
-                total_size += sys.getsizeof(item.get("data", {}))
+            sample = list(itertools.islice(self._cache.values(), 32))
+            avg_payload = sum(sys.getsizeof(entry[1]) for entry in sample) / len(sample)
+            total_size = sys.getsizeof(self._cache) + int(n * (self._entry_overhead + avg_payload))
             
             # Convertir a KB/MB
             if total_size < 1024:
@@ -161,4 +274,33 @@ class MemoryCacheService(ICacheService):
                 return f"{total_size / (1024 * 1024):.1f} MB"
                 
         except Exception:
-            return "Unknown"
\ No newline at end of file
+            return "Unknown"
+
+
+class NullCacheService(ICacheService):
+    """
+    Cache nulo (Null Object) usado cuando el cache está deshabilitado
+    
+    Todas las operaciones son no-op; los repositorios reciben siempre un
+    ICacheService y no necesitan comprobar si hay cache.
+    """
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Siempre es un miss"""
+        return None
+    
+    def set(self, key: str, data: Dict[str, Any], ttl_seconds: int = 3600) -> None:
+        """No guarda nada"""
+        pass
+    
+    def delete(self, key: str) -> None:
+        """No hay nada que eliminar"""
+        pass
+    
+    def clear_all(self) -> None:
+        """No hay nada que limpiar"""
+        pass
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Sin estadísticas"""
+        return {}
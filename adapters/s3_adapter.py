@@ -2,17 +2,68 @@
 Adaptador S3 mejorado con principios SOLID
 Implementa IDataAdapter para abstracción de persistencia
 """
+import copy
 import json
 import logging
+import uuid
+from datetime import date
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 
+import boto3
+from botocore.config import Config
+
 from interfaces.repository_interface import IDataAdapter
+from adapters.cache_adapter import MemoryCacheService
 from ask_sdk_s3.adapter import S3Adapter as AskS3Adapter
 
 
 logger = logging.getLogger(__name__)
 
 
+# Estructura inicial de datos de un usuario nuevo (solo lectura, se copia al usarla)
+_INITIAL_TEMPLATE = MappingProxyType({
+    "libros_disponibles": [],
+    "prestamos_activos": [],
+    "historial_prestamos": [],
+    "estadisticas": {
+        "total_libros": 0,
+        "total_prestamos": 0,
+        "total_devoluciones": 0
+    },
+    "historial_conversaciones": [],
+    "configuracion": {
+        "limite_prestamos": 10,
+        "dias_prestamo": 7
+    },
+    "usuario_frecuente": False,
+    "version": "2.0"  # Para futuras migraciones
+})
+
+
+def _initial_user_data() -> Dict[str, Any]:
+    """
+    Obtiene una copia nueva de la estructura inicial de datos de un usuario
+    
+    Returns:
+        Diccionario con estructura inicial
+    """
+    return copy.deepcopy(dict(_INITIAL_TEMPLATE))
+
+
+# Adaptadores de ask_sdk_s3 compartidos por bucket para reutilizar el cliente boto3
+_S3_ADAPTERS: Dict[str, AskS3Adapter] = {}
+
+# Cliente S3 con keep-alive y timeouts acotados al límite de respuesta de Alexa (~8 s)
+_S3_CLIENT_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=10,
+    connect_timeout=3,
+    read_timeout=5,
+    retries={"mode": "adaptive", "total_max_attempts": 3}
+)
+
+
 class S3DataAdapter(IDataAdapter):
     """
     Adaptador para persistencia en S3
@@ -21,8 +72,22 @@ class S3DataAdapter(IDataAdapter):
     - Single Responsibility: Solo manejo de persistencia S3
     - Open/Closed: Abierto para extensión, cerrado para modificación
     - Dependency Inversion: Implementa interfaz abstracta
+    
+    Lecturas en tres niveles (pendientes → cache → S3) y escrituras
+    write-back: save_attributes solo actualiza memoria y flush() hace
+    un único PUT a S3 al final de la request.
+    
+    El cache de lectura solo vive dentro de una request: flush() y
+    clear_cache() (llamado al inicio de cada request) descartan la copia
+    del usuario, así que cada turno vuelve a leer S3 como mínimo una vez.
+    Las lecturas devuelven siempre una copia, para que un handler que
+    falla a medias no deje cambios en los datos compartidos.
     """
     
+    _READ_CACHE_TTL = 300  # Tope de seguridad; la copia se descarta al acabar la request
+    # Claves que todo documento de usuario debe tener
+    _REQUIRED_KEYS = frozenset(_INITIAL_TEMPLATE)
+    
     def __init__(self, bucket_name: str):
         """
         Constructor del adaptador S3
@@ -31,7 +96,18 @@ class S3DataAdapter(IDataAdapter):
             bucket_name: Nombre del bucket S3
         """
         self._bucket_name = bucket_name
-        self._s3_adapter = AskS3Adapter(bucket_name=bucket_name)
+        self._s3_adapter = _S3_ADAPTERS.get(bucket_name)
+        if self._s3_adapter is None:
+            self._s3_adapter = AskS3Adapter(
+                bucket_name=bucket_name,
+                s3_client=boto3.client("s3", config=_S3_CLIENT_CONFIG)
+            )
+            _S3_ADAPTERS[bucket_name] = self._s3_adapter
+        # (ordinal del día, prefijo "PREST-YYYYMMDD-") para no formatear la fecha en cada préstamo
+        self._date_prefix_cache = (None, "")
+        # Atributos guardados pero aún no enviados a S3, por user_id
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._cache_layer = MemoryCacheService()
         logger.info(f"S3DataAdapter initialized with bucket: {bucket_name}")
     
     def get_attributes(self, request_envelope) -> Dict[str, Any]:
@@ -44,6 +120,15 @@ class S3DataAdapter(IDataAdapter):
         Returns:
             Diccionario con atributos del usuario
         """
+        user_id = self._extract_user_id(request_envelope)
+        pending = self._dirty.get(user_id)
+        if pending is not None:
+            return copy.deepcopy(pending)
+        
+        cached = self._cache_layer.get(user_id)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
         try:
             attributes = self._s3_adapter.get_attributes(request_envelope)
             
@@ -54,8 +139,9 @@ class S3DataAdapter(IDataAdapter):
             
             # Validar y normalizar estructura
             attributes = self._validate_and_normalize_data(attributes)
+            self._cache_layer.set(user_id, attributes, self._READ_CACHE_TTL)
             
-            return attributes
+            return copy.deepcopy(attributes)
             
         except Exception as e:
             logger.error(f"Error getting attributes from S3: {e}")
@@ -64,23 +150,79 @@ class S3DataAdapter(IDataAdapter):
     
     def save_attributes(self, request_envelope, attributes: Dict[str, Any]) -> None:
         """
-        Guarda atributos persistentes del usuario en S3
+        Guarda atributos persistentes del usuario (write-back)
+        
+        Los datos quedan pendientes en memoria hasta la siguiente llamada a flush().
+        Se guarda una copia: cambios posteriores del llamador no la afectan.
         
         Args:
             request_envelope: Envelope de la request de Alexa
             attributes: Atributos a guardar
         """
+        user_id = self._extract_user_id(request_envelope)
+        
+        # Validar y normalizar datos antes de guardar
+        normalized_attributes = self._validate_and_normalize_data(attributes)
+        
+        # Los pendientes tienen prioridad en get_attributes; la copia en cache ya no sirve
+        self._dirty[user_id] = copy.deepcopy(normalized_attributes)
+        self._cache_layer.delete(user_id)
+    
+    def flush(self, request_envelope) -> None:
+        """
+        Envía a S3 los atributos pendientes del usuario de la request
+        
+        Los pendientes solo se descartan cuando el PUT termina bien. Si falla se
+        relanza la excepción y siguen pendientes para reintentarse en el próximo
+        flush(). En ambos casos se descarta la copia de lectura del usuario.
+        
+        Args:
+            request_envelope: Envelope de la request de Alexa
+        """
+        user_id = self._extract_user_id(request_envelope)
+        self._cache_layer.delete(user_id)
+        pending = self._dirty.get(user_id)
+        if pending is None:
+            return
+        
         try:
-            # Validar y normalizar datos antes de guardar
-            normalized_attributes = self._validate_and_normalize_data(attributes)
-            
-            # Guardar en S3
-            self._s3_adapter.save_attributes(request_envelope, normalized_attributes)
-            logger.info("Attributes saved successfully to S3")
+            self._s3_adapter.save_attributes(request_envelope, pending)
+            logger.debug("Attributes saved successfully to S3")
             
         except Exception as e:
             logger.error(f"Error saving attributes to S3: {e}")
             raise
+        
+        del self._dirty[user_id]
+    
+    def discard_pending(self, request_envelope) -> None:
+        """
+        Descarta sin enviar las escrituras pendientes del usuario y su copia de lectura
+        
+        Se usa cuando la request falla: lo que el handler guardó a medias no
+        debe llegar a S3 en un flush posterior.
+        
+        Args:
+            request_envelope: Envelope de la request de Alexa
+        """
+        user_id = self._extract_user_id(request_envelope)
+        if self._dirty.pop(user_id, None) is not None:
+            logger.warning("Discarded pending attributes for user %s", user_id)
+        self._cache_layer.delete(user_id)
+    
+    def clear_cache(self, user_id: Optional[str] = None) -> None:
+        """
+        Descarta las copias en memoria de un usuario (o de todos)
+        
+        Las escrituras pendientes no se tocan; solo se envían con flush().
+        
+        Args:
+            user_id: ID del usuario, o None para vaciar todo
+        """
+        if user_id is None:
+            self._cache_layer.clear_all()
+        else:
+            self._cache_layer.delete(user_id)
     
     def delete_attributes(self, request_envelope) -> None:
         """
@@ -89,6 +231,10 @@ class S3DataAdapter(IDataAdapter):
         Args:
             request_envelope: Envelope de la request de Alexa
         """
+        user_id = self._extract_user_id(request_envelope)
+        self._dirty.pop(user_id, None)
+        self.clear_cache(user_id)
+        
         try:
             self._s3_adapter.delete_attributes(request_envelope)
             logger.info("Attributes deleted successfully from S3")
@@ -97,6 +243,18 @@ class S3DataAdapter(IDataAdapter):
             logger.error(f"Error deleting attributes from S3: {e}")
             raise
     
+    def _extract_user_id(self, request_envelope) -> str:
+        """
+        Extrae el user_id del request envelope
+        
+        Args:
+            request_envelope: Envelope de la request
+        
+        Returns:
+            User ID
+        """
+        return request_envelope.context.system.user.user_id
+    
     def _get_initial_user_data(self) -> Dict[str, Any]:
         """
         Obtiene la estructura inicial de datos para un usuario nuevo
@@ -104,23 +262,7 @@ class S3DataAdapter(IDataAdapter):
         Returns:
             Diccionario con estructura inicial
         """
-        return {
-            "libros_disponibles": [],
-            "prestamos_activos": [],
-            "historial_prestamos": [],
-            "estadisticas": {
-                "total_libros": 0,
-                "total_prestamos": 0,
-                "total_devoluciones": 0
-            },
-            "historial_conversaciones": [],
-            "configuracion": {
-                "limite_prestamos": 10,
-                "dias_prestamo": 7
-            },
-            "usuario_frecuente": False,
-            "version": "2.0"  # Para futuras migraciones
-        }
+        return _initial_user_data()
     
     def _validate_and_normalize_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -136,38 +278,35 @@ class S3DataAdapter(IDataAdapter):
             logger.warning("Data is not a dictionary, returning initial structure")
             return self._get_initial_user_data()
         
-        # Asegurar que existan las claves principales
-        initial_data = self._get_initial_user_data()
-        
-        for key, default_value in initial_data.items():
-            if key not in data:
-                data[key] = default_value
-                logger.info(f"Added missing key '{key}' with default value")
+        # Asegurar que existan las claves principales (solo se copia lo que falta)
+        missing = self._REQUIRED_KEYS - data.keys()
+        for key in missing:
+            data[key] = copy.deepcopy(_INITIAL_TEMPLATE[key])
+            logger.debug("Added missing key '%s' with default value", key)
         
         # Validar tipos específicos
-        self._validate_books_data(data)
-        self._validate_loans_data(data)
-        self._validate_statistics_data(data)
+        self._validate_all(data)
         
         return data
     
-    def _validate_books_data(self, data: Dict[str, Any]) -> None:
+    def _validate_all(self, data: Dict[str, Any]) -> None:
         """
-        Valida la estructura de datos de libros
+        Valida libros, préstamos y estadísticas en una sola pasada
+        
+        Los datos vienen de JSON, así que se comparan tipos exactos (list/dict).
         
         Args:
             data: Datos a validar (se modifica in-place)
         """
-        books = data.get("libros_disponibles", [])
-        if not isinstance(books, list):
+        # Validar libros
+        books = data.get("libros_disponibles")
+        if type(books) is not list:
             logger.warning("libros_disponibles is not a list, resetting to empty list")
-            data["libros_disponibles"] = []
-            return
+            books = []
         
-        # Validar cada libro
         valid_books = []
         for book_data in books:
-            if isinstance(book_data, dict) and book_data.get("titulo"):
+            if type(book_data) is dict and book_data.get("titulo"):
                 # Asegurar que tenga ID
                 if not book_data.get("id"):
                     book_data["id"] = self._generate_id()
@@ -182,61 +321,40 @@ class S3DataAdapter(IDataAdapter):
                 valid_books.append(book_data)
             else:
                 logger.warning(f"Invalid book data found and removed: {book_data}")
-        
         data["libros_disponibles"] = valid_books
-    
-    def _validate_loans_data(self, data: Dict[str, Any]) -> None:
-        """
-        Valida la estructura de datos de préstamos
         
-        Args:
-            data: Datos a validar (se modifica in-place)
-        """
         # Validar préstamos activos
-        active_loans = data.get("prestamos_activos", [])
-        if not isinstance(active_loans, list):
+        active_loans = data.get("prestamos_activos")
+        if type(active_loans) is not list:
             logger.warning("prestamos_activos is not a list, resetting to empty list")
-            data["prestamos_activos"] = []
-        else:
-            valid_loans = []
-            for loan_data in active_loans:
-                if isinstance(loan_data, dict) and loan_data.get("libro_id"):
-                    # Asegurar que tenga ID
-                    if not loan_data.get("id"):
-                        loan_data["id"] = self._generate_loan_id()
-                    
-                    valid_loans.append(loan_data)
-                else:
-                    logger.warning(f"Invalid active loan data found and removed: {loan_data}")
-            data["prestamos_activos"] = valid_loans
+            active_loans = []
+        
+        valid_loans = []
+        for loan_data in active_loans:
+            if type(loan_data) is dict and loan_data.get("libro_id"):
+                # Asegurar que tenga ID
+                if not loan_data.get("id"):
+                    loan_data["id"] = self._generate_loan_id()
+                
+                valid_loans.append(loan_data)
+            else:
+                logger.warning(f"Invalid active loan data found and removed: {loan_data}")
+        data["prestamos_activos"] = valid_loans
         
         # Validar historial de préstamos
-        loan_history = data.get("historial_prestamos", [])
-        if not isinstance(loan_history, list):
+        if type(data.get("historial_prestamos")) is not list:
             logger.warning("historial_prestamos is not a list, resetting to empty list")
             data["historial_prestamos"] = []
-    
-    def _validate_statistics_data(self, data: Dict[str, Any]) -> None:
-        """
-        Valida y actualiza estadísticas
         
-        Args:
-            data: Datos a validar (se modifica in-place)
-        """
-        stats = data.get("estadisticas", {})
-        if not isinstance(stats, dict):
+        # Actualizar estadísticas con los conteos ya calculados
+        stats = data.get("estadisticas")
+        if type(stats) is not dict:
             stats = {}
         
-        # Calcular estadísticas actuales
-        books_count = len(data.get("libros_disponibles", []))
-        active_loans_count = len(data.get("prestamos_activos", []))
-        loan_history_count = len(data.get("historial_prestamos", []))
-        
-        # Actualizar estadísticas
-        stats["total_libros"] = books_count
+        stats["total_libros"] = len(valid_books)
         stats["total_prestamos"] = stats.get("total_prestamos", 0)
         stats["total_devoluciones"] = stats.get("total_devoluciones", 0)
-        stats["prestamos_activos"] = active_loans_count
+        stats["prestamos_activos"] = len(valid_loans)
         
         data["estadisticas"] = stats
     
@@ -247,8 +365,7 @@ class S3DataAdapter(IDataAdapter):
         Returns:
             ID único
         """
-        import uuid
-        return str(uuid.uuid4())[:8]
+        return uuid.uuid4().hex[:8]
     
     def _generate_loan_id(self) -> str:
         """
@@ -257,8 +374,12 @@ class S3DataAdapter(IDataAdapter):
         Returns:
             ID único para préstamo
         """
-        from datetime import datetime
-        return f"PREST-{datetime.now().strftime('%Y%m%d')}-{self._generate_id()}"
+        today = date.today()
+        ordinal, prefix = self._date_prefix_cache
+        if ordinal != today.toordinal():
+            prefix = f"PREST-{today.strftime('%Y%m%d')}-"
+            self._date_prefix_cache = (today.toordinal(), prefix)
+        return prefix + self._generate_id()
 
 
 class FakeS3DataAdapter(IDataAdapter):
@@ -288,8 +409,7 @@ class FakeS3DataAdapter(IDataAdapter):
         
         if not attributes:
             # Retornar estructura inicial
-            s3_adapter = S3DataAdapter("fake")
-            attributes = s3_adapter._get_initial_user_data()
+            attributes = _initial_user_data()
             self._store[user_id] = attributes
         
         return attributes
@@ -304,7 +424,8 @@ class FakeS3DataAdapter(IDataAdapter):
         """
         user_id = self._extract_user_id(request_envelope)
         self._store[user_id] = attributes.copy()
-        logger.info(f"FakeS3: Saved attributes for user {user_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("FakeS3: Saved attributes for user %s", user_id)
     
     def delete_attributes(self, request_envelope) -> None:
         """
@@ -314,8 +435,7 @@ class FakeS3DataAdapter(IDataAdapter):
             request_envelope: Envelope de la request de Alexa
         """
         user_id = self._extract_user_id(request_envelope)
-        if user_id in self._store:
-            del self._store[user_id]
+        if self._store.pop(user_id, None) is not None:
             logger.info(f"FakeS3: Deleted attributes for user {user_id}")
     
     def _extract_user_id(self, request_envelope) -> str:
@@ -2,26 +2,64 @@
 Factory para crear servicios aplicando principios SOLID
 Implementa Factory Pattern y Dependency Injection
 """
+import functools
 import os
 import logging
-from typing import Optional, Dict, Any
+import pickle
+import threading
+from datetime import datetime
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Callable, Optional, Dict, Any, Tuple
 
-# Importaciones de servicios
-from services.book_service import BookService
-from services.loan_service import LoanService
+from interfaces.repository_interface import ICacheService
+from helpers.utils import get_user_id
 
-# Importaciones de repositorios
-from repositories.book_repository import BookRepository
-from repositories.loan_repository import LoanRepository
+# Servicios, repositorios y adaptadores se importan al crearlos (menor cold start)
+if TYPE_CHECKING:
+    from services.book_service import BookService
+    from services.loan_service import LoanService
+    from repositories.book_repository import BookRepository
+    from repositories.loan_repository import LoanRepository
+    from interfaces.repository_interface import IDataAdapter
 
-# Importaciones de adaptadores
-from adapters.s3_adapter import S3DataAdapter, FakeS3DataAdapter
-from adapters.cache_adapter import MemoryCacheService
+logger = logging.getLogger(__name__)
 
-# Importaciones de interfaces
-from interfaces.repository_interface import IDataAdapter, ICacheService
+# Configuración desde variables de entorno (se lee una sola vez al importar)
+_USE_FAKE_S3 = os.getenv("USE_FAKE_S3", "false").lower() == "true"
+_ENABLE_CACHE = os.getenv("ENABLE_CACHE", "true").lower() == "true"
+_S3_BUCKET = os.environ.get("S3_PERSISTENCE_BUCKET")
+_PREWARM = os.getenv("PREWARM") == "1"
 
-logger = logging.getLogger(__name__)
+# Estructura inicial de datos de un usuario nuevo, sin fecha_creacion (solo lectura)
+_INITIAL_TEMPLATE = MappingProxyType({
+    "libros_disponibles": [],
+    "prestamos_activos": [],
+    "historial_prestamos": [],
+    "estadisticas": {
+        "total_libros": 0,
+        "total_prestamos": 0,
+        "total_devoluciones": 0,
+        "prestamos_activos": 0
+    },
+    "historial_conversaciones": [],
+    "configuracion": {
+        "limite_prestamos": 10,
+        "dias_prestamo": 7
+    },
+    "usuario_frecuente": False,
+    "version": "2.0"
+})
+# Copia serializada de la plantilla: pickle.loads clona más rápido que copy.deepcopy
+_INITIAL_BLOB = pickle.dumps(dict(_INITIAL_TEMPLATE), protocol=5)
+
+# Clave en request_attributes donde DatabaseManager.get_user_data deja lo leído
+_USER_DATA_ATTR = "_user_data"
+
+# Marca de "aún no creado"
+_MISSING: Any = object()
+
+# Clave de cache de los datos de un usuario
+_USER_KEY = "user_data_{}".format
 
 
 class ServiceFactory:
@@ -35,126 +73,183 @@ class ServiceFactory:
     - Singleton Pattern: Una instancia por tipo de servicio
     """
     
+    __slots__ = (
+        "_data_adapter", "_cache_service", "_book_repository", "_loan_repository",
+        "_make_book_service", "_make_loan_service",
+        "_use_fake_s3", "_enable_cache", "_s3_bucket"
+    )
+    
     def __init__(self):
         """Constructor de la factory"""
-        # Instancias singleton de componentes base
-        self._data_adapter: Optional[IDataAdapter] = None
-        self._cache_service: Optional[ICacheService] = None
-        self._book_repository: Optional[BookRepository] = None
-        self._loan_repository: Optional[LoanRepository] = None
+        # Instancias singleton de componentes base (_MISSING hasta crearlas)
+        self._data_adapter: 'IDataAdapter' = _MISSING
+        self._cache_service: ICacheService = _MISSING
+        self._book_repository: 'BookRepository' = _MISSING
+        self._loan_repository: 'LoanRepository' = _MISSING
+        
+        # Servicios precalculados sobre los repositorios actuales
+        self._make_book_service: Optional[Callable[[], 'BookService']] = None
+        self._make_loan_service: Optional[Callable[[], 'LoanService']] = None
         
         # Configuración desde variables de entorno
-        self._use_fake_s3 = os.getenv("USE_FAKE_S3", "false").lower() == "true"
-        self._enable_cache = os.getenv("ENABLE_CACHE", "true").lower() == "true"
-        self._s3_bucket = os.environ.get("S3_PERSISTENCE_BUCKET")
+        self._use_fake_s3 = _USE_FAKE_S3
+        self._enable_cache = _ENABLE_CACHE
+        self._s3_bucket = _S3_BUCKET
         
-        logger.info(f"ServiceFactory initialized - Fake S3: {self._use_fake_s3}, Cache: {self._enable_cache}")
+        logger.info("ServiceFactory initialized - Fake S3: %s, Cache: %s", self._use_fake_s3, self._enable_cache)
     
-    def get_data_adapter(self) -> IDataAdapter:
+    def get_data_adapter(self) -> 'IDataAdapter':
         """
         Obtiene o crea el adaptador de datos (Singleton)
         
         Returns:
             Instancia del adaptador de datos
         """
-        if self._data_adapter is None:
+        if self._data_adapter is _MISSING:
             if self._use_fake_s3:
+                from adapters.s3_adapter import FakeS3DataAdapter
                 self._data_adapter = FakeS3DataAdapter()
                 logger.info("Created FakeS3DataAdapter")
             else:
                 if not self._s3_bucket:
                     raise RuntimeError("S3_PERSISTENCE_BUCKET es requerido cuando USE_FAKE_S3=false")
                 
+                from adapters.s3_adapter import S3DataAdapter
                 self._data_adapter = S3DataAdapter(self._s3_bucket)
-                logger.info(f"Created S3DataAdapter with bucket: {self._s3_bucket}")
+                logger.info("Created S3DataAdapter with bucket: %s", self._s3_bucket)
         
         return self._data_adapter
     
-    def get_cache_service(self) -> Optional[ICacheService]:
+    def get_cache_service(self) -> ICacheService:
         """
         Obtiene o crea el servicio de cache (Singleton)
         
         Returns:
-            Instancia del servicio de cache o None si está deshabilitado
+            Instancia del servicio de cache (cache nulo si está deshabilitado)
         """
-        if not self._enable_cache:
-            return None
-        
-        if self._cache_service is None:
-            self._cache_service = MemoryCacheService()
-            logger.info("Created MemoryCacheService")
+        if self._cache_service is _MISSING:
+            if self._enable_cache:
+                from adapters.cache_adapter import MemoryCacheService
+                self._cache_service = MemoryCacheService()
+                logger.info("Created MemoryCacheService")
+            else:
+                from adapters.cache_adapter import NullCacheService
+                self._cache_service = NullCacheService()
         
         return self._cache_service
     
-    def get_book_repository(self, handler_input=None) -> BookRepository:
+    def _deps(self) -> Tuple['IDataAdapter', ICacheService]:
         """
-        Obtiene o crea el repositorio de libros (Singleton)
+        Resuelve una sola vez el adaptador de datos y el cache que comparten los repositorios
         
-        Args:
-            handler_input: Input del handler (para futuras extensiones)
+        Returns:
+            Tupla (adaptador de datos, servicio de cache)
+        """
+        return self.get_data_adapter(), self.get_cache_service()
+    
+    def get_book_repository(self) -> 'BookRepository':
+        """
+        Obtiene o crea el repositorio de libros (Singleton)
         
         Returns:
             Instancia del repositorio de libros
         """
-        if self._book_repository is None:
-            data_adapter = self.get_data_adapter()
-            cache_service = self.get_cache_service()
-            
-            self._book_repository = BookRepository(data_adapter, cache_service)
-            logger.info("Created BookRepository")
+        if self._book_repository is _MISSING:
+            self._create_book_repository(*self._deps())
         
         return self._book_repository
     
-    def get_loan_repository(self, handler_input=None) -> LoanRepository:
+    def _create_book_repository(self, data_adapter: 'IDataAdapter', cache_service: ICacheService) -> None:
         """
-        Obtiene o crea el repositorio de préstamos (Singleton)
+        Crea el repositorio de libros con dependencias ya resueltas
         
         Args:
-            handler_input: Input del handler (para futuras extensiones)
+            data_adapter: Adaptador de datos
+            cache_service: Servicio de cache
+        """
+        from repositories.book_repository import BookRepository
+        self._book_repository = BookRepository(data_adapter, cache_service)
+        logger.info("Created BookRepository")
+    
+    def get_loan_repository(self) -> 'LoanRepository':
+        """
+        Obtiene o crea el repositorio de préstamos (Singleton)
         
         Returns:
             Instancia del repositorio de préstamos
         """
-        if self._loan_repository is None:
-            data_adapter = self.get_data_adapter()
-            cache_service = self.get_cache_service()
-            
-            self._loan_repository = LoanRepository(data_adapter, cache_service)
-            logger.info("Created LoanRepository")
+        if self._loan_repository is _MISSING:
+            self._create_loan_repository(*self._deps())
         
         return self._loan_repository
     
-    def get_book_service(self, handler_input=None) -> BookService:
+    def _create_loan_repository(self, data_adapter: 'IDataAdapter', cache_service: ICacheService) -> None:
         """
-        Obtiene una NUEVA instancia del servicio de libros
-        Los servicios son stateless, se crean nuevos cada vez
+        Crea el repositorio de préstamos con dependencias ya resueltas
+        
+        Args:
+            data_adapter: Adaptador de datos
+            cache_service: Servicio de cache
+        """
+        from repositories.loan_repository import LoanRepository
+        self._loan_repository = LoanRepository(data_adapter, cache_service)
+        logger.info("Created LoanRepository")
+    
+    def get_book_service(self, handler_input=None) -> 'BookService':
+        """
+        Obtiene el servicio de libros
+        Los servicios son stateless, se comparte una instancia hasta el próximo reset
         
         Args:
             handler_input: Input del handler (para futuras extensiones)
         
         Returns:
-            Nueva instancia del servicio de libros
+            Instancia del servicio de libros
         """
-        book_repository = self.get_book_repository(handler_input)
-        loan_repository = self.get_loan_repository(handler_input)
-        
-        return BookService(book_repository, loan_repository)
+        if self._make_book_service is None:
+            self._build_service_makers()
+        return self._make_book_service()
     
-    def get_loan_service(self, handler_input=None) -> LoanService:
+    def get_loan_service(self, handler_input=None) -> 'LoanService':
         """
-        Obtiene una NUEVA instancia del servicio de préstamos
-        Los servicios son stateless, se crean nuevos cada vez
+        Obtiene el servicio de préstamos
+        Los servicios son stateless, se comparte una instancia hasta el próximo reset
         
         Args:
             handler_input: Input del handler (para futuras extensiones)
         
         Returns:
-            Nueva instancia del servicio de préstamos
+            Instancia del servicio de préstamos
         """
-        book_repository = self.get_book_repository(handler_input)
-        loan_repository = self.get_loan_repository(handler_input)
+        if self._make_loan_service is None:
+            self._build_service_makers()
+        return self._make_loan_service()
+    
+    def _build_service_makers(self) -> None:
+        """
+        Resuelve los repositorios una vez y precalcula los servicios compartidos
+        
+        Así get_book_service/get_loan_service no recorren el grafo de dependencias
+        en cada llamada.
+        """
+        from services.book_service import BookService
+        from services.loan_service import LoanService
+        
+        if self._book_repository is _MISSING or self._loan_repository is _MISSING:
+            data_adapter, cache_service = self._deps()
+            if self._book_repository is _MISSING:
+                self._create_book_repository(data_adapter, cache_service)
+            if self._loan_repository is _MISSING:
+                self._create_loan_repository(data_adapter, cache_service)
+        
+        book_repository = self._book_repository
+        loan_repository = self._loan_repository
         
-        return LoanService(book_repository, loan_repository)
+        # Los servicios no guardan estado propio: basta una instancia por par de repositorios
+        book_service = BookService(book_repository, loan_repository)
+        loan_service = LoanService(book_repository, loan_repository)
+        self._make_book_service = lambda: book_service
+        self._make_loan_service = lambda: loan_service
     
     def get_database_manager(self, handler_input) -> 'DatabaseManager':
         """
@@ -169,18 +264,30 @@ class ServiceFactory:
         """
         return DatabaseManager(handler_input, self.get_data_adapter())
     
+    def _clear_cache(self) -> None:
+        """
+        Vacía el servicio de cache y las copias en memoria del adaptador de datos
+        """
+        if self._cache_service is not _MISSING:
+            self._cache_service.clear_all()
+            logger.info("Cache cleared")
+        if self._data_adapter is not _MISSING:
+            self._data_adapter.clear_cache()
+    
+    def _clear_repos(self) -> None:
+        """
+        Descarta repositorios y constructores de servicios para forzar su recreación
+        """
+        self._book_repository = self._loan_repository = _MISSING
+        self._make_book_service = self._make_loan_service = None
+    
     def reset_cache(self) -> None:
         """
         Limpia el cache y reinicia los servicios
         Útil para testing y desarrollo
         """
-        if self._cache_service:
-            self._cache_service.clear_all()
-            logger.info("Cache cleared")
-        
-        # Resetear instancias para forzar recreación
-        self._book_repository = None
-        self._loan_repository = None
+        self._clear_cache()
+        self._clear_repos()
         
         logger.info("ServiceFactory repositories reset")
     
@@ -189,13 +296,12 @@ class ServiceFactory:
         Resetea TODOS los componentes de la factory
         Para testing exhaustivo
         """
-        self.reset_cache()
+        self._clear_cache()
+        self._clear_repos()
         
-        # Resetear TODOS los componentes
-        self._data_adapter = None
-        self._cache_service = None
-        self._book_repository = None
-        self._loan_repository = None
+        # Resetear también adaptador y cache
+        self._data_adapter = self._cache_service = _MISSING
+        _clear_default_deps()
         
         logger.info("ServiceFactory completely reset")
     
@@ -212,8 +318,9 @@ class ServiceFactory:
         
         # Resetear TODO para que use nueva configuración
         self.reset_all()
+        self._build_service_makers()
         
-        logger.info(f"ServiceFactory configured for testing - Fake S3: {use_fake_s3}, Cache: {enable_cache}")
+        logger.info("ServiceFactory configured for testing - Fake S3: %s, Cache: %s", use_fake_s3, enable_cache)
     
     def configure_for_production(self, s3_bucket: str, enable_cache: bool = True) -> None:
         """
@@ -229,8 +336,9 @@ class ServiceFactory:
         
         # Resetear para aplicar configuración
         self.reset_all()
+        self._build_service_makers()
         
-        logger.info(f"ServiceFactory configured for production - S3 bucket: {s3_bucket}, Cache: {enable_cache}")
+        logger.info("ServiceFactory configured for production - S3 bucket: %s, Cache: %s", s3_bucket, enable_cache)
     
     def get_factory_stats(self) -> Dict[str, Any]:
         """
@@ -247,15 +355,15 @@ class ServiceFactory:
                 "s3_bucket": self._s3_bucket or "Not configured"
             },
             "instances": {
-                "data_adapter_created": self._data_adapter is not None,
-                "cache_service_created": self._cache_service is not None,
-                "book_repository_created": self._book_repository is not None,
-                "loan_repository_created": self._loan_repository is not None
+                "data_adapter_created": self._data_adapter is not _MISSING,
+                "cache_service_created": self._cache_service is not _MISSING and self._enable_cache,
+                "book_repository_created": self._book_repository is not _MISSING,
+                "loan_repository_created": self._loan_repository is not _MISSING
             }
         }
         
         # Agregar estadísticas de cache si existe
-        if self._cache_service:
+        if self._cache_service is not _MISSING and self._enable_cache:
             stats["cache_stats"] = self._cache_service.get_stats()
         
         return stats
@@ -267,7 +375,7 @@ class DatabaseManager:
     Actúa como bridge/adapter entre el código viejo y la nueva arquitectura
     """
     
-    def __init__(self, handler_input, data_adapter: IDataAdapter):
+    def __init__(self, handler_input, data_adapter: 'IDataAdapter'):
         """
         Constructor
         
@@ -277,8 +385,8 @@ class DatabaseManager:
         """
         self.handler_input = handler_input
         self.data_adapter = data_adapter
-        self.user_id = handler_input.request_envelope.context.system.user.user_id
-        logger.info(f"DatabaseManager created for user: {self.user_id}")
+        self.user_id = DatabaseManager._user_id(handler_input)
+        logger.info("DatabaseManager created for user: %s", self.user_id)
     
     def get_user_data_instance(self) -> Dict[str, Any]:
         """
@@ -292,12 +400,12 @@ class DatabaseManager:
             
             if not user_data:
                 user_data = self.initial_data()
-                logger.info(f"Created initial data for user: {self.user_id}")
+                logger.info("Created initial data for user: %s", self.user_id)
             
             return user_data
             
         except Exception as e:
-            logger.error(f"Error getting user data for {self.user_id}: {e}")
+            logger.error("Error getting user data for %s: %s", self.user_id, e)
             return self.initial_data()
     
     def save_user_data_instance(self, data: Dict[str, Any]) -> None:
@@ -309,10 +417,10 @@ class DatabaseManager:
         """
         try:
             self.data_adapter.save_attributes(self.handler_input.request_envelope, data)
-            logger.info(f"Saved user data for {self.user_id}")
+            logger.info("Saved user data for %s", self.user_id)
             
         except Exception as e:
-            logger.error(f"Error saving user data for {self.user_id}: {e}")
+            logger.error("Error saving user data for %s: %s", self.user_id, e)
             raise
     
     @staticmethod
@@ -320,14 +428,21 @@ class DatabaseManager:
         """
         Método estático para compatibilidad total con código original
         
+        El resultado se guarda en los atributos de la request para no repetir
+        la lectura dentro de la misma request (no se comparte entre requests).
+        
         Args:
             handler_input: Input del handler
         
         Returns:
             Datos del usuario
         """
-        factory = get_service_factory()
-        data_adapter = factory.get_data_adapter()
+        request_attributes = handler_input.attributes_manager.request_attributes
+        memo = request_attributes.get(_USER_DATA_ATTR)
+        if memo is not None:
+            return memo
+        
+        data_adapter = _default_adapter()
         
         try:
             user_data = data_adapter.get_attributes(handler_input.request_envelope)
@@ -338,10 +453,11 @@ class DatabaseManager:
                 data_adapter.save_attributes(handler_input.request_envelope, user_data)
                 logger.info("Created and saved initial user data structure")
             
+            request_attributes[_USER_DATA_ATTR] = user_data
             return user_data
             
         except Exception as e:
-            logger.error(f"Error in static get_user_data: {e}")
+            logger.error("Error in static get_user_data: %s", e)
             return DatabaseManager.initial_data()
     
     @staticmethod
@@ -353,25 +469,27 @@ class DatabaseManager:
             handler_input: Input del handler
             data: Datos a guardar
         """
-        factory = get_service_factory()
-        data_adapter = factory.get_data_adapter()
-        cache_service = factory.get_cache_service()
+        user_id = DatabaseManager._user_id(handler_input)
+        handler_input.attributes_manager.request_attributes.pop(_USER_DATA_ATTR, None)
+        
+        data_adapter = _default_adapter()
+        cache_service = _default_cache()
         
         try:
             # Guardar en persistencia principal
             data_adapter.save_attributes(handler_input.request_envelope, data)
             
-            # También actualizar cache si existe
-            if cache_service:
-                user_id = handler_input.request_envelope.context.system.user.user_id
-                cache_key = f"user_data_{user_id}"
+            # También actualizar cache (no-op si está deshabilitado)
+            cache_key = _USER_KEY(user_id)
+            # Si el cache ya tiene este mismo objeto no hace falta volver a guardarlo
+            if cache_service.peek(cache_key) is not data:
                 cache_service.set(cache_key, data, ttl_seconds=3600)
-                logger.info(f"Updated cache for user: {user_id}")
-                
+                logger.info("Updated cache for user: %s", user_id)
+            
             logger.info("User data saved successfully")
                 
         except Exception as e:
-            logger.error(f"Error in static save_user_data: {e}")
+            logger.error("Error in static save_user_data: %s", e)
             raise
     
     @staticmethod
@@ -382,27 +500,9 @@ class DatabaseManager:
         Returns:
             Diccionario con estructura inicial completa
         """
-        from datetime import datetime
-        
-        return {
-            "libros_disponibles": [],
-            "prestamos_activos": [],
-            "historial_prestamos": [],
-            "estadisticas": {
-                "total_libros": 0,
-                "total_prestamos": 0,
-                "total_devoluciones": 0,
-                "prestamos_activos": 0
-            },
-            "historial_conversaciones": [],
-            "configuracion": {
-                "limite_prestamos": 10,
-                "dias_prestamo": 7
-            },
-            "usuario_frecuente": False,
-            "fecha_creacion": datetime.now().isoformat(),
-            "version": "2.0"
-        }
+        data = pickle.loads(_INITIAL_BLOB)
+        data["fecha_creacion"] = datetime.now().isoformat()
+        return data
     
     @staticmethod
     def _user_id(handler_input) -> str:
@@ -416,28 +516,26 @@ class DatabaseManager:
         Returns:
             User ID del usuario
         """
-        return handler_input.request_envelope.context.system.user.user_id
+        return get_user_id(handler_input)
 
 
 # =================================================
 # SINGLETON PATTERN PARA FACTORY GLOBAL
 # =================================================
 
-_service_factory_instance = None
-
-
+@functools.cache
 def get_service_factory() -> ServiceFactory:
     """
     Obtiene la instancia global de ServiceFactory (Singleton Pattern)
     
+    functools.cache guarda la instancia tras la primera llamada.
+    
     Returns:
         Instancia global de ServiceFactory
     """
-    global _service_factory_instance
-    if _service_factory_instance is None:
-        _service_factory_instance = ServiceFactory()
-        logger.info("Created global ServiceFactory instance")
-    return _service_factory_instance
+    factory = ServiceFactory()
+    logger.info("Created global ServiceFactory instance")
+    return factory
 
 
 def reset_service_factory() -> None:
@@ -445,11 +543,41 @@ def reset_service_factory() -> None:
     Resetea la instancia global de ServiceFactory
     Útil para testing y desarrollo
     """
-    global _service_factory_instance
-    if _service_factory_instance:
-        _service_factory_instance.reset_all()
+    if get_service_factory.cache_info().currsize:
+        get_service_factory().reset_all()
         logger.info("Reset global ServiceFactory instance")
-    _service_factory_instance = None
+    get_service_factory.cache_clear()
+    _clear_default_deps()
+
+
+@functools.cache
+def _default_adapter() -> 'IDataAdapter':
+    """
+    Adaptador de datos de la factory global, para los métodos estáticos de DatabaseManager
+    
+    Returns:
+        Adaptador de datos
+    """
+    return get_service_factory().get_data_adapter()
+
+
+@functools.cache
+def _default_cache() -> ICacheService:
+    """
+    Servicio de cache de la factory global, para los métodos estáticos de DatabaseManager
+    
+    Returns:
+        Servicio de cache
+    """
+    return get_service_factory().get_cache_service()
+
+
+def _clear_default_deps() -> None:
+    """
+    Olvida el adaptador y el cache por defecto (al resetear la factory)
+    """
+    _default_adapter.cache_clear()
+    _default_cache.cache_clear()
 
 
 def configure_service_factory_for_testing() -> ServiceFactory:
@@ -481,3 +609,23 @@ def configure_service_factory_for_production(s3_bucket: str) -> ServiceFactory:
     factory = get_service_factory()
     factory.configure_for_production(s3_bucket, enable_cache=True)
     return factory
+
+
+def _prewarm_s3_client() -> None:
+    """
+    Construye en segundo plano el cliente S3 compartido del bucket configurado
+    
+    Solo crea el adaptador de ask_sdk_s3 (lo costoso del cold start); la factory
+    lo reutiliza después sin que el hilo toque sus singletons.
+    """
+    try:
+        from adapters.s3_adapter import S3DataAdapter
+        S3DataAdapter(_S3_BUCKET)
+        logger.info("Prewarmed S3 client for bucket: %s", _S3_BUCKET)
+    except Exception as e:
+        logger.warning("S3 prewarm failed: %s", e)
+
+
+# Pre-calentamiento opcional (PREWARM=1) para sacar la creación del cliente boto3 de la primera request
+if _PREWARM and not _USE_FAKE_S3 and _S3_BUCKET:
+    threading.Thread(target=_prewarm_s3_client, name="s3-prewarm", daemon=True).start()
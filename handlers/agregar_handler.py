@@ -4,20 +4,21 @@ Aplican SOLID: cada handler traduce Alexa ↔ Servicios (SRP)
 Los servicios se obtienen vía ServiceFactory (DIP)
 """
 import logging
-from typing import Optional, List
+from typing import Optional
 
 import ask_sdk_core.utils as ask_utils
 from ask_sdk_core.dispatch_components import AbstractRequestHandler
-from ask_sdk_model import Response
 
-from factories.service_factory import get_service_factory, DatabaseManager
-from helpers.phrases import SALUDOS, OPCIONES_MENU, PREGUNTAS_QUE_HACER, ALGO_MAS, CONFIRMACIONES
-from helpers.utils import IdGenerator
+from factories.service_factory import get_service_factory
+from helpers.utils import ResponsePhrases, get_user_id
 
 logger = logging.getLogger(__name__)
 
-def _user_id(handler_input) -> str:
-    return handler_input.request_envelope.context.system.user.user_id
+# Respuestas que significan "no sé" (comparación en minúsculas)
+_UNKNOWN = frozenset({"no sé", "no se", "no lo sé", "no lo se"})
+
+# Predicados de intent construidos una sola vez
+_IS_ADD = ask_utils.is_intent_name("AgregarLibroIntent")
 
 def _slot(handler_input, name: str) -> Optional[str]:
     try:
@@ -25,22 +26,16 @@ def _slot(handler_input, name: str) -> Optional[str]:
     except Exception:
         return None
 
-def _choose(arr: List[str]) -> str:
-    try:
-        return IdGenerator.choose_random(arr)
-    except Exception:
-        import random
-        return random.choice(arr)
+def _reset_session(handler_input) -> None:
+    handler_input.attributes_manager.session_attributes.clear()
 
-from interfaces.repository_interface import IBookRepository, ILoanRepository  # solo para type hints
-from services.book_service import BookService
+def _respond(handler_input, speak: str, ask: str):
+    rb = handler_input.response_builder
+    return rb.speak(speak).ask(ask).response
 
 class AgregarLibroHandler(AbstractRequestHandler):
-    def __init__(self):
-        self.factory = get_service_factory()
-
     def can_handle(self, handler_input):
-        return ask_utils.is_intent_name("AgregarLibroIntent")(handler_input)
+        return _IS_ADD(handler_input)
 
     def handle(self, handler_input):
         try:
@@ -51,34 +46,32 @@ class AgregarLibroHandler(AbstractRequestHandler):
 
             if not titulo:
                 sa.update({"agregando_libro": True, "esperando": "titulo"})
-                return handler_input.response_builder.speak("¡Perfecto! Vamos a agregar un libro. ¿Cuál es el título?").ask("¿Cuál es el título del libro?").response
+                return _respond(handler_input, "¡Perfecto! Vamos a agregar un libro. ¿Cuál es el título?", "¿Cuál es el título del libro?")
 
-            sa["titulo_temp"] = titulo
             if not autor:
-                sa.update({"agregando_libro": True, "esperando": "autor"})
-                return handler_input.response_builder.speak(f"¡'{titulo}' suena interesante! ¿Quién es el autor? Si no lo sabes, di: no sé.").ask("¿Quién es el autor?").response
+                sa.update({"titulo_temp": titulo, "agregando_libro": True, "esperando": "autor"})
+                return _respond(handler_input, f"¡'{titulo}' suena interesante! ¿Quién es el autor? Si no lo sabes, di: no sé.", "¿Quién es el autor?")
 
-            sa["autor_temp"] = autor
             if not tipo:
-                sa.update({"agregando_libro": True, "esperando": "tipo"})
-                autor_text = f" de {autor}" if autor and autor.lower() not in ["no sé", "no se", "no lo sé"] else ""
-                return handler_input.response_builder.speak(f"Casi listo con '{titulo}'{autor_text}. ¿De qué tipo o género es? Si no sabes, di: no sé.").ask("¿De qué tipo es el libro?").response
+                sa.update({"titulo_temp": titulo, "autor_temp": autor, "agregando_libro": True, "esperando": "tipo"})
+                autor_text = f" de {autor}" if autor and autor.lower() not in _UNKNOWN else ""
+                return _respond(handler_input, f"Casi listo con '{titulo}'{autor_text}. ¿De qué tipo o género es? Si no sabes, di: no sé.", "¿De qué tipo es el libro?")
 
             # normalizaciones
-            if autor and autor.lower() in ["no sé","no se","no lo sé"]:
+            if autor and autor.lower() in _UNKNOWN:
                 autor = "Desconocido"
-            if tipo and tipo.lower() in ["no sé","no se","no lo sé"]:
+            if tipo and tipo.lower() in _UNKNOWN:
                 tipo = "Sin categoría"
 
-            service = self.factory.get_book_service(handler_input)
-            ok, msg, book = service.add_book(_user_id(handler_input), titulo, autor, tipo)
+            service = get_service_factory().get_book_service(handler_input)
+            ok, msg, book = service.add_book(get_user_id(handler_input), titulo, autor, tipo)
 
             # limpiar sesión
-            handler_input.attributes_manager.session_attributes = {}
-            speak = msg if msg else f"¡Perfecto! He agregado '{titulo}'. "
-            speak += " " + _choose(ALGO_MAS)
-            return handler_input.response_builder.speak(speak).ask(_choose(PREGUNTAS_QUE_HACER)).response
+            _reset_session(handler_input)
+            confirmacion, algo_mas, pregunta = ResponsePhrases.get_success_triplet()
+            speak = ResponsePhrases.book_added_speech(titulo, msg, confirmacion, algo_mas)
+            return _respond(handler_input, speak, pregunta)
         except Exception:
             logger.exception("Error en AgregarLibroHandler")
-            handler_input.attributes_manager.session_attributes = {}
-            return handler_input.response_builder.speak("Hubo un problema agregando el libro. Intentemos de nuevo.").ask("¿Qué libro quieres agregar?").response
+            _reset_session(handler_input)
+            return _respond(handler_input, "Hubo un problema agregando el libro. Intentemos de nuevo.", "¿Qué libro quieres agregar?")
@@ -4,7 +4,7 @@ Aplican SOLID: cada handler traduce Alexa ↔ Servicios (SRP)
 Los servicios se obtienen vía ServiceFactory (DIP)
 """
 import logging
-from typing import Optional, List
+from typing import Optional
 
 import ask_sdk_core.utils as ask_utils
 from ask_sdk_core.dispatch_components import AbstractRequestHandler
@@ -12,30 +12,29 @@ from ask_sdk_model import Response
 
 from factories.service_factory import get_service_factory, DatabaseManager
 from helpers.phrases import SALUDOS, OPCIONES_MENU, PREGUNTAS_QUE_HACER, ALGO_MAS, CONFIRMACIONES
-from helpers.utils import IdGenerator
+from helpers.utils import choose_phrase
 
 logger = logging.getLogger(__name__)
 
-def _user_id(handler_input) -> str:
-    return handler_input.request_envelope.context.system.user.user_id
-
 def _slot(handler_input, name: str) -> Optional[str]:
     try:
         return ask_utils.get_slot_value(handler_input, name)
     except Exception:
         return None
 
-def _choose(arr: List[str]) -> str:
-    try:
-        return IdGenerator.choose_random(arr)
-    except Exception:
-        import random
-        return random.choice(arr)
+_HELP_SPEAK = (
+    "Puedo ayudarte a agregar, listar, buscar, prestar y devolver libros. "
+    "Por ejemplo, di: agrega el libro Cien años de soledad; o: préstame El principito a Ana; "
+    "o: lista mis libros disponibles. "
+)
+
+_IS_HELP = ask_utils.is_intent_name("AMAZON.HelpIntent")
+_IS_AYUDA = ask_utils.is_intent_name("AyudaIntent")
 
 class AyudaHandler(AbstractRequestHandler):
     def can_handle(self, handler_input):
-        return ask_utils.is_intent_name("AMAZON.HelpIntent")(handler_input) or ask_utils.is_intent_name("AyudaIntent")(handler_input)
+        return _IS_HELP(handler_input) or _IS_AYUDA(handler_input)
 
     def handle(self, handler_input):
-        speak = "Puedo ayudarte a agregar, listar, buscar, prestar y devolver libros. "                 "Por ejemplo, di: agrega el libro Cien años de soledad; o: préstame El principito a Ana; "                 "o: lista mis libros disponibles. " + _choose(PREGUNTAS_QUE_HACER)
-        return handler_input.response_builder.speak(speak).ask(_choose(PREGUNTAS_QUE_HACER)).response
+        pregunta = choose_phrase(PREGUNTAS_QUE_HACER)
+        return handler_input.response_builder.speak(_HELP_SPEAK + pregunta).ask(pregunta).response
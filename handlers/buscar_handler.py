@@ -1,6 +1,6 @@
 
 import logging
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 import ask_sdk_core.utils as ask_utils
 from ask_sdk_core.dispatch_components import AbstractRequestHandler
@@ -8,34 +8,55 @@ from ask_sdk_model import Response
 
 from factories.service_factory import get_service_factory, DatabaseManager
 from helpers.phrases import SALUDOS, OPCIONES_MENU, PREGUNTAS_QUE_HACER, ALGO_MAS, CONFIRMACIONES
-from helpers.utils import IdGenerator
+from helpers.utils import get_user_id, choose_phrase
 
 logger = logging.getLogger(__name__)
 
-def _user_id(handler_input) -> str:
-    return handler_input.request_envelope.context.system.user.user_id
-
 def _slot(handler_input, name: str) -> Optional[str]:
     try:
         return ask_utils.get_slot_value(handler_input, name)
     except Exception:
         return None
 
-def _choose(arr: List[str]) -> str:
-    try:
-        return IdGenerator.choose_random(arr)
-    except Exception:
-        import random
-        return random.choice(arr)
-
 from services.book_service import BookService
+from models.book import Book
 
-class BuscarLibroHandler(AbstractRequestHandler):
-    def __init__(self):
-        self.factory = get_service_factory()
+_IS_BUSCAR = ask_utils.is_intent_name("BuscarLibroIntent")
+
+# Búsquedas recientes guardadas en la sesión (la sesión ya es de un solo usuario)
+_SEARCH_CACHE_KEY = "_search_cache"
+_SEARCH_CACHE_MAX = 16
 
+def _search(handler_input, service, titulo: str) -> Tuple[int, List[Book]]:
+    """
+    Busca libros por título reutilizando los resultados recientes de la sesión
+
+    Solo se guardan el total y los 3 primeros libros, que es lo que usa la respuesta.
+
+    Args:
+        handler_input: Input del handler
+        service: Servicio de libros
+        titulo: Título a buscar
+
+    Returns:
+        Tuple[int, List[Book]]: (total de coincidencias, hasta 3 libros)
+    """
+    cache = handler_input.attributes_manager.session_attributes.setdefault(_SEARCH_CACHE_KEY, {})
+    key = titulo.strip().lower()
+    hit = cache.get(key)
+    if hit is not None:
+        return hit["total"], [Book.from_dict(d) for d in hit["libros"]]
+
+    encontrados = service.search_books_by_title(get_user_id(handler_input), titulo.strip()) or []
+    cache[key] = {"total": len(encontrados), "libros": [b.to_dict() for b in encontrados[:3]]}
+    # Descartar las búsquedas más antiguas (FIFO)
+    while len(cache) > _SEARCH_CACHE_MAX:
+        del cache[next(iter(cache))]
+    return len(encontrados), encontrados[:3]
+
+class BuscarLibroHandler(AbstractRequestHandler):
     def can_handle(self, handler_input):
-        return ask_utils.is_intent_name("BuscarLibroIntent")(handler_input)
+        return _IS_BUSCAR(handler_input)
 
     def handle(self, handler_input):
         try:
@@ -43,23 +64,23 @@ class BuscarLibroHandler(AbstractRequestHandler):
             if not titulo:
                 return handler_input.response_builder.speak("¿Qué libro quieres buscar?").ask("Dime el título del libro que buscas.").response
 
-            service = self.factory.get_book_service(handler_input)
-            user_id = _user_id(handler_input)
-            encontrados = service.search_books_by_title(user_id, titulo.strip()) or []
+            service = get_service_factory().get_book_service(handler_input)
+            total, encontrados = _search(handler_input, service, titulo)
 
-            if not encontrados:
-                return handler_input.response_builder.speak(f"No encontré ningún libro con el título '{titulo}'. " + _choose(ALGO_MAS)).ask(_choose(PREGUNTAS_QUE_HACER)).response
-            if len(encontrados) == 1:
+            if not total:
+                return handler_input.response_builder.speak(f"No encontré ningún libro con el título '{titulo}'. " + choose_phrase(ALGO_MAS)).ask(choose_phrase(PREGUNTAS_QUE_HACER)).response
+            if total == 1:
                 b = encontrados[0]
-                speak = f"Encontré '{b.titulo}'. Autor: {b.autor or 'Desconocido'}. Tipo: {b.tipo or 'Sin categoría'}. Estado: {b.estado.value}. "
+                parts = [f"Encontré '{b.titulo}'. Autor: {b.autor or 'Desconocido'}. Tipo: {b.tipo or 'Sin categoría'}. Estado: {b.estado.value}. "]
                 if b.total_prestamos and b.total_prestamos > 0:
-                    speak += f"Ha sido prestado {b.total_prestamos} veces. "
-                speak += _choose(ALGO_MAS)
-                return handler_input.response_builder.speak(speak).ask(_choose(PREGUNTAS_QUE_HACER)).response
+                    parts.append(f"Ha sido prestado {b.total_prestamos} veces. ")
+                parts.append(choose_phrase(ALGO_MAS))
+                speak = "".join(parts)
+                return handler_input.response_builder.speak(speak).ask(choose_phrase(PREGUNTAS_QUE_HACER)).response
             else:
-                listado = ", ".join([f"'{b.titulo}'" for b in encontrados[:3]])
-                speak = f"Encontré {len(encontrados)} libros que coinciden con '{titulo}': {listado}. " + _choose(ALGO_MAS)
-                return handler_input.response_builder.speak(speak).ask(_choose(PREGUNTAS_QUE_HACER)).response
+                listado = ", ".join(f"'{b.titulo}'" for b in encontrados)
+                speak = f"Encontré {total} libros que coinciden con '{titulo}': {listado}. " + choose_phrase(ALGO_MAS)
+                return handler_input.response_builder.speak(speak).ask(choose_phrase(PREGUNTAS_QUE_HACER)).response
         except Exception:
             logger.exception("Error en BuscarLibroHandler")
             return handler_input.response_builder.speak("Hubo un problema buscando el libro. ¿Intentamos de nuevo?").ask("¿Qué libro buscas?").response
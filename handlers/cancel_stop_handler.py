@@ -1,6 +1,6 @@
 
 import logging
-from typing import Optional, List
+from typing import Optional
 
 import ask_sdk_core.utils as ask_utils
 from ask_sdk_core.dispatch_components import AbstractRequestHandler
@@ -8,29 +8,21 @@ from ask_sdk_model import Response
 
 from factories.service_factory import get_service_factory, DatabaseManager
 from helpers.phrases import SALUDOS, OPCIONES_MENU, PREGUNTAS_QUE_HACER, ALGO_MAS, CONFIRMACIONES
-from helpers.utils import IdGenerator
 
 logger = logging.getLogger(__name__)
 
-def _user_id(handler_input) -> str:
-    return handler_input.request_envelope.context.system.user.user_id
-
 def _slot(handler_input, name: str) -> Optional[str]:
     try:
         return ask_utils.get_slot_value(handler_input, name)
     except Exception:
         return None
 
-def _choose(arr: List[str]) -> str:
-    try:
-        return IdGenerator.choose_random(arr)
-    except Exception:
-        import random
-        return random.choice(arr)
+_IS_CANCEL = ask_utils.is_intent_name("AMAZON.CancelIntent")
+_IS_STOP = ask_utils.is_intent_name("AMAZON.StopIntent")
 
 class CancelStopHandler(AbstractRequestHandler):
     def can_handle(self, handler_input):
-        return ask_utils.is_intent_name("AMAZON.CancelIntent")(handler_input) or ask_utils.is_intent_name("AMAZON.StopIntent")(handler_input)
+        return _IS_CANCEL(handler_input) or _IS_STOP(handler_input)
 
     def handle(self, handler_input):
         return handler_input.response_builder.speak("¡Hasta luego!").response
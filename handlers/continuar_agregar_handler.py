@@ -1,19 +1,30 @@
 
 import logging
-from typing import Optional, List
+import re
+from typing import Optional
 
 import ask_sdk_core.utils as ask_utils
 from ask_sdk_core.dispatch_components import AbstractRequestHandler
-from ask_sdk_model import Response
 
-from factories.service_factory import get_service_factory, DatabaseManager
-from helpers.phrases import SALUDOS, OPCIONES_MENU, PREGUNTAS_QUE_HACER, ALGO_MAS, CONFIRMACIONES
-from helpers.utils import IdGenerator
+from factories.service_factory import get_service_factory
+from helpers.utils import ResponsePhrases, get_user_id
 
 logger = logging.getLogger(__name__)
 
-def _user_id(handler_input) -> str:
-    return handler_input.request_envelope.context.system.user.user_id
+# Respuestas que significan "no sé" (comparación en minúsculas)
+_UNKNOWN = frozenset({"no sé", "no se", "no lo sé", "no lo se"})
+_UNKNOWN_AUTOR = _UNKNOWN | {"no sé el autor", "no se el autor"}
+_UNKNOWN_TIPO = _UNKNOWN | {"no sé el tipo", "no se el tipo"}
+# Predicados de intent construidos una sola vez
+_IS_ADD = ask_utils.is_intent_name("AgregarLibroIntent")
+_IS_CANCEL = ask_utils.is_intent_name("AMAZON.CancelIntent")
+_IS_STOP = ask_utils.is_intent_name("AMAZON.StopIntent")
+_IS_RESPUESTA = ask_utils.is_intent_name("RespuestaGeneralIntent")
+# Prefijos que se quitan de la respuesta en cada paso ("el autor es X" -> "X", "es X" -> "X")
+_STRIP_AUTOR_RE = re.compile(r"^(?:el autor es|es) ", re.IGNORECASE)
+_STRIP_TIPO_RE = re.compile(r"^(?:el tipo es|es) ", re.IGNORECASE)
+# Basta pasar a minúsculas este inicio para reconocer las respuestas "no sé"
+_HEAD_LEN = max(len(x) for x in _UNKNOWN_AUTOR | _UNKNOWN_TIPO) + 1
 
 def _slot(handler_input, name: str) -> Optional[str]:
     try:
@@ -21,38 +32,42 @@ def _slot(handler_input, name: str) -> Optional[str]:
     except Exception:
         return None
 
-def _choose(arr: List[str]) -> str:
-    try:
-        return IdGenerator.choose_random(arr)
-    except Exception:
-        import random
-        return random.choice(arr)
+def _normalize_answer(valor: Optional[str], unknown: frozenset, prefix: re.Pattern, default: str) -> str:
+    if not valor:
+        return default
+    if valor[:_HEAD_LEN].lower() in unknown:
+        return default
+    return prefix.sub("", valor.strip(), count=1).strip()
+
+def _reset_session(handler_input) -> None:
+    handler_input.attributes_manager.session_attributes.clear()
+
+def _respond(handler_input, speak: str, ask: str):
+    rb = handler_input.response_builder
+    return rb.speak(speak).ask(ask).response
 
 class ContinuarAgregarHandler(AbstractRequestHandler):
     """
     Continúa el flujo de agregar libro cuando estamos esperando título/autor/tipo.
     Se activa si hay estado de sesión 'agregando_libro' y no es otro intent de control.
     """
-    def __init__(self):
-        self.factory = get_service_factory()
-
     def can_handle(self, handler_input):
-        sa = handler_input.attributes_manager.session_attributes
-        return bool(sa.get("agregando_libro")) and not ask_utils.is_intent_name("AgregarLibroIntent")(handler_input) and not ask_utils.is_intent_name("AMAZON.CancelIntent")(handler_input) and not ask_utils.is_intent_name("AMAZON.StopIntent")(handler_input)
+        # Fuera del flujo de agregar (el caso común) basta con revisar la sesión
+        if not handler_input.attributes_manager.session_attributes.get("agregando_libro"):
+            return False
+        return not (_IS_ADD(handler_input) or _IS_CANCEL(handler_input) or _IS_STOP(handler_input))
 
     def _extract_free_text(self, handler_input) -> Optional[str]:
         # intento 1: RespuestaGeneralIntent.respuesta
-        if ask_utils.is_intent_name("RespuestaGeneralIntent")(handler_input):
+        if _IS_RESPUESTA(handler_input):
             val = _slot(handler_input, "respuesta")
             if val: 
                 return val
         # intento 2: primer slot con valor
         try:
-            intent = handler_input.request_envelope.request.intent
-            if intent and intent.slots:
-                for s in intent.slots.values():
-                    if getattr(s, "value", None):
-                        return s.value
+            slots = getattr(handler_input.request_envelope.request.intent, "slots", None)
+            if slots:
+                return next((s.value for s in slots.values() if s and getattr(s, "value", None)), None)
         except Exception:
             pass
         return None
@@ -66,49 +81,37 @@ class ContinuarAgregarHandler(AbstractRequestHandler):
 
             if esperando == "titulo":
                 if valor:
-                    sa["titulo_temp"] = valor
-                    sa["esperando"] = "autor"
-                    return handler_input.response_builder.speak(f"¡'{valor}' suena interesante! ¿Quién es el autor? Si no lo sabes, di: no sé el autor.").ask("¿Quién es el autor?").response
+                    sa.update({"titulo_temp": valor, "esperando": "autor"})
+                    return _respond(handler_input, f"¡'{valor}' suena interesante! ¿Quién es el autor? Si no lo sabes, di: no sé el autor.", "¿Quién es el autor?")
                 else:
-                    return handler_input.response_builder.speak("No entendí el título. Di: 'el título es' seguido del nombre.").ask("¿Cuál es el título del libro?").response
+                    return _respond(handler_input, "No entendí el título. Di: 'el título es' seguido del nombre.", "¿Cuál es el título del libro?")
 
             if esperando == "autor":
-                if not valor or valor.lower() in ["no sé","no se","no lo sé","no lo se","no sé el autor","no se el autor"]:
-                    valor = "Desconocido"
-                elif valor.lower().startswith("el autor es "):
-                    valor = valor[12:].strip()
-                elif valor.lower().startswith("es "):
-                    valor = valor[3:].strip()
-
-                sa["autor_temp"] = valor
-                sa["esperando"] = "tipo"
+                valor = _normalize_answer(valor, _UNKNOWN_AUTOR, _STRIP_AUTOR_RE, "Desconocido")
+
+                sa.update({"autor_temp": valor, "esperando": "tipo"})
                 titulo = sa.get("titulo_temp")
                 autor_text = f" de {valor}" if valor != "Desconocido" else ""
-                return handler_input.response_builder.speak(f"Perfecto, '{titulo}'{autor_text}. ¿De qué tipo o género es? Si no sabes, di: no sé el tipo.").ask("¿De qué tipo es el libro?").response
+                return _respond(handler_input, f"Perfecto, '{titulo}'{autor_text}. ¿De qué tipo o género es? Si no sabes, di: no sé el tipo.", "¿De qué tipo es el libro?")
 
             if esperando == "tipo":
-                if not valor or valor.lower() in ["no sé","no se","no lo sé","no lo se","no sé el tipo","no se el tipo"]:
-                    valor = "Sin categoría"
-                elif valor.lower().startswith("el tipo es "):
-                    valor = valor[11:].strip()
-                elif valor.lower().startswith("es "):
-                    valor = valor[3:].strip()
+                valor = _normalize_answer(valor, _UNKNOWN_TIPO, _STRIP_TIPO_RE, "Sin categoría")
 
                 titulo = sa.get("titulo_temp")
                 autor = sa.get("autor_temp","Desconocido")
                 tipo = valor
 
-                service = self.factory.get_book_service(handler_input)
-                ok, msg, book = service.add_book(_user_id(handler_input), titulo, autor, tipo)
-                handler_input.attributes_manager.session_attributes = {}
-                speak = msg if msg else f"¡Perfecto! He agregado '{titulo}'. "
-                speak += " " + _choose(ALGO_MAS)
-                return handler_input.response_builder.speak(speak).ask(_choose(PREGUNTAS_QUE_HACER)).response
+                service = get_service_factory().get_book_service(handler_input)
+                ok, msg, book = service.add_book(get_user_id(handler_input), titulo, autor, tipo)
+                _reset_session(handler_input)
+                confirmacion, algo_mas, pregunta = ResponsePhrases.get_success_triplet()
+                speak = ResponsePhrases.book_added_speech(titulo, msg, confirmacion, algo_mas)
+                return _respond(handler_input, speak, pregunta)
 
             # fallback
-            handler_input.attributes_manager.session_attributes = {}
-            return handler_input.response_builder.speak("Hubo un problema. Empecemos de nuevo. ¿Qué libro quieres agregar?").ask("¿Qué libro quieres agregar?").response
+            _reset_session(handler_input)
+            return _respond(handler_input, "Hubo un problema. Empecemos de nuevo. ¿Qué libro quieres agregar?", "¿Qué libro quieres agregar?")
         except Exception:
             logger.exception("Error en ContinuarAgregarHandler")
-            handler_input.attributes_manager.session_attributes = {}
-            return handler_input.response_builder.speak("Hubo un problema. Intentemos agregar el libro de nuevo.").ask("¿Qué libro quieres agregar?").response
+            _reset_session(handler_input)
+            return _respond(handler_input, "Hubo un problema. Intentemos agregar el libro de nuevo.", "¿Qué libro quieres agregar?")
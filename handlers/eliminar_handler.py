@@ -1,6 +1,6 @@
 
 import logging
-from typing import Optional, List
+from typing import Optional
 
 import ask_sdk_core.utils as ask_utils
 from ask_sdk_core.dispatch_components import AbstractRequestHandler
@@ -8,34 +8,32 @@ from ask_sdk_model import Response
 
 from factories.service_factory import get_service_factory, DatabaseManager
 from helpers.phrases import SALUDOS, OPCIONES_MENU, PREGUNTAS_QUE_HACER, ALGO_MAS, CONFIRMACIONES
-from helpers.utils import IdGenerator
+from helpers.utils import get_user_id, choose_phrase
 
 logger = logging.getLogger(__name__)
 
-def _user_id(handler_input) -> str:
-    return handler_input.request_envelope.context.system.user.user_id
-
 def _slot(handler_input, name: str) -> Optional[str]:
     try:
         return ask_utils.get_slot_value(handler_input, name)
     except Exception:
         return None
 
-def _choose(arr: List[str]) -> str:
-    try:
-        return IdGenerator.choose_random(arr)
-    except Exception:
-        import random
-        return random.choice(arr)
-
 from services.book_service import BookService
 
-class EliminarLibroHandler(AbstractRequestHandler):
-    def __init__(self):
-        self.factory = get_service_factory()
+_IS_ELIMINAR = ask_utils.is_intent_name("EliminarLibroIntent")
+
+def _cached_book_id(sa: dict, titulo: str) -> Optional[str]:
+    # Si el título se buscó en esta sesión con un único resultado, se elimina por ID
+    # sin volver a recorrer el catálogo buscando por título
+    cache = sa.get("_search_cache") or {}
+    hit = cache.get(titulo.strip().lower())
+    if hit and hit["total"] == 1:
+        return hit["libros"][0].get("id")
+    return None
 
+class EliminarLibroHandler(AbstractRequestHandler):
     def can_handle(self, handler_input):
-        return ask_utils.is_intent_name("EliminarLibroIntent")(handler_input)
+        return _IS_ELIMINAR(handler_input)
 
     def handle(self, handler_input):
         try:
@@ -44,12 +42,18 @@ class EliminarLibroHandler(AbstractRequestHandler):
             if not titulo and not book_id:
                 return handler_input.response_builder.speak("¿Cuál libro quieres eliminar? Puedes decir el título.").ask("Dime el título del libro que quieres borrar.").response
 
-            service = self.factory.get_book_service(handler_input)
-            ok, msg, book = service.delete_book(_user_id(handler_input), book_id=book_id, title=titulo)
+            sa = handler_input.attributes_manager.session_attributes
+            if not book_id:
+                book_id = _cached_book_id(sa, titulo)
+
+            service = get_service_factory().get_book_service(handler_input)
+            ok, msg, book = service.delete_book(get_user_id(handler_input), book_id=book_id, title=titulo)
             if not ok:
                 return handler_input.response_builder.speak(msg).ask("¿Quieres eliminar otro libro?").response
-            speak = msg + " " + _choose(ALGO_MAS)
-            return handler_input.response_builder.speak(speak).ask(_choose(PREGUNTAS_QUE_HACER)).response
+            # Las búsquedas guardadas en la sesión ya no reflejan el catálogo
+            sa.pop("_search_cache", None)
+            speak = msg + " " + choose_phrase(ALGO_MAS)
+            return handler_input.response_builder.speak(speak).ask(choose_phrase(PREGUNTAS_QUE_HACER)).response
         except Exception:
             logger.exception("Error en EliminarLibroHandler")
-            return handler_input.response_builder.speak("No pude eliminar el libro. Verifica el título e inténtalo de nuevo.").ask(_choose(PREGUNTAS_QUE_HACER)).response
+            return handler_input.response_builder.speak("No pude eliminar el libro. Verifica el título e inténtalo de nuevo.").ask(choose_phrase(PREGUNTAS_QUE_HACER)).response
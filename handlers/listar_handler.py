@@ -1,6 +1,6 @@
 
 import logging
-from typing import Optional, List
+from typing import Optional
 
 import ask_sdk_core.utils as ask_utils
 from ask_sdk_core.dispatch_components import AbstractRequestHandler
@@ -8,34 +8,21 @@ from ask_sdk_model import Response
 
 from factories.service_factory import get_service_factory, DatabaseManager
 from helpers.phrases import SALUDOS, OPCIONES_MENU, PREGUNTAS_QUE_HACER, ALGO_MAS, CONFIRMACIONES
-from helpers.utils import IdGenerator
+from helpers.utils import get_user_id, choose_phrase
 
 logger = logging.getLogger(__name__)
 
-def _user_id(handler_input) -> str:
-    return handler_input.request_envelope.context.system.user.user_id
-
 def _slot(handler_input, name: str) -> Optional[str]:
     try:
         return ask_utils.get_slot_value(handler_input, name)
     except Exception:
         return None
 
-def _choose(arr: List[str]) -> str:
-    try:
-        return IdGenerator.choose_random(arr)
-    except Exception:
-        import random
-        return random.choice(arr)
-
 from services.book_service import BookService
 
 LIBROS_POR_PAGINA = 10
 
 class ListarLibrosHandler(AbstractRequestHandler):
-    def __init__(self):
-        self.factory = get_service_factory()
-
     def can_handle(self, handler_input):
         return ask_utils.is_intent_name("ListarLibrosIntent")(handler_input)
 
@@ -53,7 +40,7 @@ class ListarLibrosHandler(AbstractRequestHandler):
     def handle(self, handler_input):
         try:
             sa = handler_input.attributes_manager.session_attributes
-            user_id = _user_id(handler_input)
+            user_id = get_user_id(handler_input)
             autor = _slot(handler_input, "autor")
             filtro = _slot(handler_input, "filtro_tipo")
 
@@ -62,11 +49,11 @@ class ListarLibrosHandler(AbstractRequestHandler):
                 autor = sa.get("autor")
                 filtro = sa.get("filtro")
 
-            service = self.factory.get_book_service(handler_input)
+            service = get_service_factory().get_book_service(handler_input)
             libros = self._filtrar(user_id, autor, filtro, service) or []
 
             if not libros:
-                return handler_input.response_builder.speak("No encontré libros con ese filtro. " + _choose(ALGO_MAS)).ask(_choose(PREGUNTAS_QUE_HACER)).response
+                return handler_input.response_builder.speak("No encontré libros con ese filtro. " + choose_phrase(ALGO_MAS)).ask(choose_phrase(PREGUNTAS_QUE_HACER)).response
 
             pagina = sa.get("pagina_libros", 0)
             inicio = pagina * LIBROS_POR_PAGINA
@@ -77,7 +64,7 @@ class ListarLibrosHandler(AbstractRequestHandler):
                 titulos = ", ".join([f"'{l.titulo}'" for l in libros])
                 sa["pagina_libros"] = 0
                 sa["listando_libros"] = False
-                return handler_input.response_builder.speak(f"Tienes {len(libros)} libros: {titulos}. " + _choose(ALGO_MAS)).ask(_choose(PREGUNTAS_QUE_HACER)).response
+                return handler_input.response_builder.speak(f"Tienes {len(libros)} libros: {titulos}. " + choose_phrase(ALGO_MAS)).ask(choose_phrase(PREGUNTAS_QUE_HACER)).response
 
             # hay paginación
             if pagina == 0:
@@ -96,11 +83,12 @@ class ListarLibrosHandler(AbstractRequestHandler):
             else:
                 sa["pagina_libros"] = 0
                 sa["listando_libros"] = False
-                ask = _choose(PREGUNTAS_QUE_HACER)
-                speak += "Esos son todos los libros. " + _choose(ALGO_MAS)
+                ask = choose_phrase(PREGUNTAS_QUE_HACER)
+                speak += "Esos son todos los libros. " + choose_phrase(ALGO_MAS)
 
             return handler_input.response_builder.speak(speak).ask(ask).response
         except Exception:
             logger.exception("Error en ListarLibrosHandler")
-            handler_input.attributes_manager.session_attributes = {}
+            # Vaciar el mismo dict de sesión en lugar de reemplazarlo
+            handler_input.attributes_manager.session_attributes.clear()
             return handler_input.response_builder.speak("Hubo un problema consultando tu biblioteca. ¿Intentamos de nuevo?").ask("¿Qué te gustaría hacer?").response
@@ -1,6 +1,6 @@
 
 import logging
-from typing import Optional, List
+from typing import Optional
 
 import ask_sdk_core.utils as ask_utils
 from ask_sdk_core.dispatch_components import AbstractRequestHandler
@@ -8,26 +8,16 @@ from ask_sdk_model import Response
 
 from factories.service_factory import get_service_factory, DatabaseManager
 from helpers.phrases import SALUDOS, OPCIONES_MENU, PREGUNTAS_QUE_HACER, ALGO_MAS, CONFIRMACIONES
-from helpers.utils import IdGenerator
+from helpers.utils import choose_phrase
 
 logger = logging.getLogger(__name__)
 
-def _user_id(handler_input) -> str:
-    return handler_input.request_envelope.context.system.user.user_id
-
 def _slot(handler_input, name: str) -> Optional[str]:
     try:
         return ask_utils.get_slot_value(handler_input, name)
     except Exception:
         return None
 
-def _choose(arr: List[str]) -> str:
-    try:
-        return IdGenerator.choose_random(arr)
-    except Exception:
-        import random
-        return random.choice(arr)
-
 class MostrarOpcionesHandler(AbstractRequestHandler):
     def can_handle(self, handler_input):
         return ask_utils.is_intent_name("MostrarOpcionesIntent")(handler_input)
@@ -38,16 +28,16 @@ class MostrarOpcionesHandler(AbstractRequestHandler):
             total_libros = len(user_data.get("libros_disponibles", []))
             prestados = len(user_data.get("prestamos_activos", []))
             intro = "¡Por supuesto! "
-            opciones = _choose(OPCIONES_MENU)
+            opciones = choose_phrase(OPCIONES_MENU)
             if total_libros == 0:
                 contexto = " Como aún no tienes libros, te sugiero empezar agregando algunos."
             elif prestados > 0:
                 contexto = " Recuerda que tienes algunos libros prestados."
             else:
                 contexto = ""
-            pregunta = " " + _choose(PREGUNTAS_QUE_HACER)
+            pregunta = " " + choose_phrase(PREGUNTAS_QUE_HACER)
             speak = intro + opciones + contexto + pregunta
-            return handler_input.response_builder.speak(speak).ask(_choose(PREGUNTAS_QUE_HACER)).response
+            return handler_input.response_builder.speak(speak).ask(choose_phrase(PREGUNTAS_QUE_HACER)).response
         except Exception:
             logger.exception("Error en MostrarOpcionesHandler")
             return handler_input.response_builder.speak("Puedo ayudarte a gestionar tu biblioteca. ¿Qué te gustaría hacer?").ask("¿En qué puedo ayudarte?").response
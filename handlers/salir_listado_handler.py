@@ -1,6 +1,6 @@
 
 import logging
-from typing import Optional, List
+from typing import Optional
 
 import ask_sdk_core.utils as ask_utils
 from ask_sdk_core.dispatch_components import AbstractRequestHandler
@@ -8,26 +8,16 @@ from ask_sdk_model import Response
 
 from factories.service_factory import get_service_factory, DatabaseManager
 from helpers.phrases import SALUDOS, OPCIONES_MENU, PREGUNTAS_QUE_HACER, ALGO_MAS, CONFIRMACIONES
-from helpers.utils import IdGenerator
+from helpers.utils import choose_phrase
 
 logger = logging.getLogger(__name__)
 
-def _user_id(handler_input) -> str:
-    return handler_input.request_envelope.context.system.user.user_id
-
 def _slot(handler_input, name: str) -> Optional[str]:
     try:
         return ask_utils.get_slot_value(handler_input, name)
     except Exception:
         return None
 
-def _choose(arr: List[str]) -> str:
-    try:
-        return IdGenerator.choose_random(arr)
-    except Exception:
-        import random
-        return random.choice(arr)
-
 class SalirListadoHandler(AbstractRequestHandler):
     def can_handle(self, handler_input):
         return ask_utils.is_intent_name("SalirListadoIntent")(handler_input)
@@ -37,7 +27,7 @@ class SalirListadoHandler(AbstractRequestHandler):
             sa = handler_input.attributes_manager.session_attributes
             sa["pagina_libros"] = 0
             sa["listando_libros"] = False
-            speak = "De acuerdo, salgo del listado. " + _choose(ALGO_MAS)
-            return handler_input.response_builder.speak(speak).ask(_choose(PREGUNTAS_QUE_HACER)).response
+            speak = "De acuerdo, salgo del listado. " + choose_phrase(ALGO_MAS)
+            return handler_input.response_builder.speak(speak).ask(choose_phrase(PREGUNTAS_QUE_HACER)).response
         except Exception:
-            return handler_input.response_builder.speak("Listo. ¿Qué otra cosa necesitas?").ask(_choose(PREGUNTAS_QUE_HACER)).response
+            return handler_input.response_builder.speak("Listo. ¿Qué otra cosa necesitas?").ask(choose_phrase(PREGUNTAS_QUE_HACER)).response
@@ -1,5 +1,5 @@
 import logging
-from typing import Optional, List
+from typing import Optional
 
 import ask_sdk_core.utils as ask_utils
 from ask_sdk_core.dispatch_components import AbstractRequestHandler
@@ -7,34 +7,21 @@ from ask_sdk_model import Response
 
 from factories.service_factory import get_service_factory, DatabaseManager
 from helpers.phrases import SALUDOS, OPCIONES_MENU, PREGUNTAS_QUE_HACER, ALGO_MAS, CONFIRMACIONES
-from helpers.utils import IdGenerator
+from helpers.utils import get_user_id, choose_phrase
 
 logger = logging.getLogger(__name__)
 
-def _user_id(handler_input) -> str:
-    return handler_input.request_envelope.context.system.user.user_id
-
 def _slot(handler_input, name: str) -> Optional[str]:
     try:
         return ask_utils.get_slot_value(handler_input, name)
     except Exception:
         return None
 
-def _choose(arr: List[str]) -> str:
-    try:
-        return IdGenerator.choose_random(arr)
-    except Exception:
-        import random
-        return random.choice(arr)
-
 from services.book_service import BookService
 
 LIBROS_POR_PAGINA = 10
 
 class SiguientePaginaHandler(AbstractRequestHandler):
-    def __init__(self):
-        self.factory = get_service_factory()
-
     def can_handle(self, handler_input):
         return ask_utils.is_intent_name("SiguientePaginaIntent")(handler_input)
 
@@ -48,8 +35,8 @@ class SiguientePaginaHandler(AbstractRequestHandler):
             pagina = sa.get("pagina_libros", 0)
             autor = sa.get("autor")
             filtro = sa.get("filtro")
-            user_id = _user_id(handler_input)
-            service = self.factory.get_book_service(handler_input)
+            user_id = get_user_id(handler_input)
+            service = get_service_factory().get_book_service(handler_input)
 
             # Obtener lista completa con mismo filtro
             if autor:
@@ -68,7 +55,7 @@ class SiguientePaginaHandler(AbstractRequestHandler):
             if not libros_pagina:
                 sa["pagina_libros"] = 0
                 sa["listando_libros"] = False
-                return handler_input.response_builder.speak("Ya no hay más libros para mostrar. " + _choose(ALGO_MAS)).ask(_choose(PREGUNTAS_QUE_HACER)).response
+                return handler_input.response_builder.speak("Ya no hay más libros para mostrar. " + choose_phrase(ALGO_MAS)).ask(choose_phrase(PREGUNTAS_QUE_HACER)).response
 
             speak = f"Libros del {inicio+1} al {fin}: " + ", ".join([f"'{l.titulo}'" for l in libros_pagina]) + ". "
             if fin < len(libros):
@@ -79,10 +66,10 @@ class SiguientePaginaHandler(AbstractRequestHandler):
             else:
                 sa["pagina_libros"] = 0
                 sa["listando_libros"] = False
-                speak += "Esos son todos. " + _choose(ALGO_MAS)
-                ask = _choose(PREGUNTAS_QUE_HACER)
+                speak += "Esos son todos. " + choose_phrase(ALGO_MAS)
+                ask = choose_phrase(PREGUNTAS_QUE_HACER)
 
             return handler_input.response_builder.speak(speak).ask(ask).response
         except Exception:
             logger.exception("Error en SiguientePaginaHandler")
-            return handler_input.response_builder.speak("No pude avanzar de página. ¿Qué más te gustaría hacer?").ask(_choose(PREGUNTAS_QUE_HACER)).response
+            return handler_input.response_builder.speak("No pude avanzar de página. ¿Qué más te gustaría hacer?").ask(choose_phrase(PREGUNTAS_QUE_HACER)).response
@@ -6,11 +6,48 @@ import uuid
 import random
 import logging
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 
 logger = logging.getLogger(__name__)
 
+# Clave en request_attributes donde se guarda el user_id ya extraído
+_USER_ID_ATTR = "_uid"
+
+
+def get_user_id(handler_input) -> str:
+    """
+    Obtiene el user_id de la request de Alexa
+    
+    Se guarda en los atributos de la request para no recorrer el envelope
+    en cada llamada.
+    
+    Args:
+        handler_input: Input del handler
+    
+    Returns:
+        User ID del usuario
+    """
+    request_attributes = handler_input.attributes_manager.request_attributes
+    user_id = request_attributes.get(_USER_ID_ATTR)
+    if user_id is None:
+        user_id = handler_input.request_envelope.context.system.user.user_id
+        request_attributes[_USER_ID_ATTR] = user_id
+    return user_id
+
+
+def choose_phrase(phrases: List[str]) -> str:
+    """
+    Selecciona una frase aleatoria de una lista
+    
+    Args:
+        phrases: Lista de frases
+    
+    Returns:
+        Frase aleatoria, o cadena vacía si la lista está vacía
+    """
+    return random.choice(phrases) if phrases else ""
+
 
 class IdGenerator:
     """
@@ -94,7 +131,39 @@ class ResponsePhrases:
         Returns:
             Frase aleatoria
         """
-        return random.choice(phrase_list) if phrase_list else ""
+        return choose_phrase(phrase_list)
+    
+    @classmethod
+    def get_success_triplet(cls) -> Tuple[str, str, str]:
+        """
+        Selecciona de una vez las frases de una respuesta de éxito
+        
+        Returns:
+            Tuple (confirmación, algo más, pregunta de qué hacer)
+        """
+        choice = random.choice
+        return choice(cls.CONFIRMACIONES), choice(cls.ALGO_MAS), choice(cls.PREGUNTAS_QUE_HACER)
+    
+    @classmethod
+    def book_added_speech(cls, titulo: str, mensaje: Optional[str] = None,
+                          confirmacion: str = "¡Perfecto!", algo_mas: Optional[str] = None) -> str:
+        """
+        Arma la respuesta de éxito al agregar un libro
+        
+        Args:
+            titulo: Título del libro agregado
+            mensaje: Mensaje del servicio (si no hay, se usa uno genérico)
+            confirmacion: Confirmación para el mensaje genérico
+            algo_mas: Frase de "algo más" (si no hay, se elige una al azar)
+        
+        Returns:
+            Texto a decir: confirmación seguida de una pregunta de "algo más"
+        """
+        return "".join((
+            mensaje or f"{confirmacion} He agregado '{titulo}'. ",
+            " ",
+            algo_mas or cls.get_random_phrase(cls.ALGO_MAS)
+        ))
 
 
 class ValidationUtils:
@@ -3,7 +3,7 @@ Interfaces para los repositorios
 Aplica el principio de Dependency Inversion y Interface Segregation
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from models.book import Book
 from models.loan import Loan
 
@@ -28,6 +28,18 @@ class IDataAdapter(ABC):
     def delete_attributes(self, request_envelope) -> None:
         """Elimina todos los atributos del usuario"""
         pass
+    
+    def flush(self, request_envelope) -> None:
+        """Persiste escrituras pendientes (no-op en adaptadores sin write-back)"""
+        pass
+    
+    def clear_cache(self, user_id: Optional[str] = None) -> None:
+        """Descarta copias en memoria de un usuario, o de todos (no-op sin cache propio)"""
+        pass
+    
+    def discard_pending(self, request_envelope) -> None:
+        """Descarta sin persistir las escrituras pendientes (no-op sin write-back)"""
+        pass
 
 
 class IBookRepository(ABC):
@@ -88,6 +100,11 @@ class ILoanRepository(ABC):
         """Obtiene el historial completo de préstamos"""
         pass
     
+    @abstractmethod
+    def find_returned_loans(self, user_id: str, limit: Optional[int] = None) -> Tuple[int, List[Loan]]:
+        """Obtiene los préstamos devueltos más recientes. Returns (total, préstamos)"""
+        pass
+    
     @abstractmethod
     def find_by_book_id(self, user_id: str, book_id: str) -> Optional[Loan]:
         """Busca préstamo activo por ID del libro"""
@@ -125,6 +142,10 @@ class ICacheService(ABC):
         """Guarda datos en cache con TTL"""
         pass
     
+    def peek(self, key: str) -> Optional[Dict[str, Any]]:
+        """Obtiene datos del cache sin afectar su orden de uso (por defecto usa get)"""
+        return self.get(key)
+    
     @abstractmethod
     def delete(self, key: str) -> None:
         """Elimina datos del cache"""
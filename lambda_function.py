@@ -4,6 +4,10 @@ import logging
 # SDK de Alexa
 import ask_sdk_core.utils as ask_utils
 from ask_sdk_core.skill_builder import CustomSkillBuilder
+from ask_sdk_core.dispatch_components import (
+    AbstractRequestInterceptor, AbstractResponseInterceptor, AbstractExceptionHandler
+)
+from ask_sdk_model.ui import SsmlOutputSpeech, Reprompt
 from ask_sdk_s3.adapter import S3Adapter
 
 logger = logging.getLogger(__name__)
@@ -62,6 +66,60 @@ from handlers.cancel_stop_handler import CancelStopHandler
 from handlers.fallback_handler import FallbackHandler        
 from handlers.session_ended_handler import SessionEndedHandler
 
+from factories.service_factory import get_service_factory
+from helpers.utils import get_user_id
+
+
+class ResetDataCacheInterceptor(AbstractRequestInterceptor):
+    """Descarta al inicio de cada request la copia de lectura que el adaptador tenga del usuario"""
+
+    def process(self, handler_input):
+        try:
+            get_service_factory().get_data_adapter().clear_cache(get_user_id(handler_input))
+        except Exception:
+            logger.exception("Error descartando el cache de datos de usuario")
+
+
+class FlushDataInterceptor(AbstractResponseInterceptor):
+    """Envía a persistencia, una sola vez por request, lo guardado durante el handler"""
+
+    ERROR_SPEECH = "<speak>Hubo un problema guardando tus datos. Intenta de nuevo.</speak>"
+    ERROR_REPROMPT = "<speak>¿Qué deseas hacer?</speak>"
+
+    def process(self, handler_input, response):
+        try:
+            get_service_factory().get_data_adapter().flush(handler_input.request_envelope)
+        except Exception:
+            logger.exception("Error haciendo flush de datos de usuario")
+            # El handler ya confirmó el cambio: se reemplaza la respuesta por el error
+            if response is not None:
+                response.output_speech = SsmlOutputSpeech(ssml=self.ERROR_SPEECH)
+                response.reprompt = Reprompt(output_speech=SsmlOutputSpeech(ssml=self.ERROR_REPROMPT))
+                response.should_end_session = False
+
+
+class DiscardDataExceptionHandler(AbstractExceptionHandler):
+    """
+    Atrapa cualquier excepción no manejada por los handlers
+
+    El SDK no ejecuta los response interceptors cuando la request falla, así que
+    aquí se descartan las escrituras pendientes para que no las envíe un flush posterior.
+    """
+
+    ERROR_SPEECH = "Lo siento, hubo un problema. Intenta de nuevo."
+    ERROR_REPROMPT = "¿Qué deseas hacer?"
+
+    def can_handle(self, handler_input, exception):
+        return True
+
+    def handle(self, handler_input, exception):
+        logger.error("Excepción no manejada: %s", exception, exc_info=exception)
+        try:
+            get_service_factory().get_data_adapter().discard_pending(handler_input.request_envelope)
+        except Exception:
+            logger.exception("Error descartando datos pendientes")
+        return handler_input.response_builder.speak(self.ERROR_SPEECH).ask(self.ERROR_REPROMPT).response
+
 
 # SkillBuilder y registro
 
@@ -95,5 +153,10 @@ sb.add_request_handler(CancelStopHandler())
 sb.add_request_handler(FallbackHandler())
 sb.add_request_handler(SessionEndedHandler())
 
+# Write-back: un único guardado al final de cada request
+sb.add_global_request_interceptor(ResetDataCacheInterceptor())
+sb.add_global_response_interceptor(FlushDataInterceptor())
+sb.add_exception_handler(DiscardDataExceptionHandler())
+
 
 handler = sb.lambda_handler()
@@ -5,6 +5,7 @@ Aplica el patrón Repository y principios SOLID
 from typing import List, Optional
 import logging
 
+from adapters.cache_adapter import NullCacheService
 from interfaces.repository_interface import IBookRepository, IDataAdapter, ICacheService
 from models.book import Book
 
@@ -28,10 +29,10 @@ class BookRepository(IBookRepository):
         
         Args:
             data_adapter: Adaptador de persistencia
-            cache_service: Servicio de cache opcional
+            cache_service: Servicio de cache opcional (sin él se usa un cache nulo)
         """
         self._data_adapter = data_adapter
-        self._cache_service = cache_service
+        self._cache_service = cache_service if cache_service is not None else NullCacheService()
         self._cache_ttl = 3600  # 1 hora
     
     def find_all(self, user_id: str) -> List[Book]:
@@ -45,25 +46,7 @@ class BookRepository(IBookRepository):
             Lista de libros
         """
         try:
-            # Intentar obtener del cache primero
-            cache_key = f"books_{user_id}"
-            if self._cache_service:
-                cached_data = self._cache_service.get(cache_key)
-                if cached_data and "libros_disponibles" in cached_data:
-                    logger.info(f"Cache hit for user books: {user_id}")
-                    books_data = cached_data["libros_disponibles"]
-                    return [Book.from_dict(book_data) for book_data in books_data]
-            
-            # Si no hay cache, obtener de persistencia
-            user_data = self._get_user_data(user_id)
-            books_data = user_data.get("libros_disponibles", [])
-            books = [Book.from_dict(book_data) for book_data in books_data]
-            
-            # Guardar en cache si está disponible
-            if self._cache_service:
-                self._cache_service.set(cache_key, user_data, self._cache_ttl)
-            
-            return books
+            return [Book.from_dict(book_data) for book_data in self._get_books_data(user_id)]
             
         except Exception as e:
             logger.error(f"Error finding all books for user {user_id}: {e}")
@@ -80,8 +63,18 @@ class BookRepository(IBookRepository):
         Returns:
             Libro encontrado o None
         """
-        books = self.find_all(user_id)
-        return next((book for book in books if book.id == book_id), None)
+        try:
+            # Se busca sobre los diccionarios guardados y solo se construye el libro encontrado
+            book_data = next(
+                (book_data for book_data in self._get_books_data(user_id)
+                 if book_data.get("id") == book_id),
+                None
+            )
+            return Book.from_dict(book_data) if book_data is not None else None
+            
+        except Exception as e:
+            logger.error(f"Error finding book {book_id} for user {user_id}: {e}")
+            return None
     
     def find_by_title(self, user_id: str, title: str) -> List[Book]:
         """
@@ -151,9 +144,7 @@ class BookRepository(IBookRepository):
             self._save_user_data(user_id, user_data)
             
             # Invalidar cache
-            if self._cache_service:
-                cache_key = f"books_{user_id}"
-                self._cache_service.delete(cache_key)
+            self._cache_service.delete(f"books_{user_id}")
             
         except Exception as e:
             logger.error(f"Error saving book {book.id} for user {user_id}: {e}")
@@ -191,9 +182,7 @@ class BookRepository(IBookRepository):
                 self._save_user_data(user_id, user_data)
                 
                 # Invalidar cache
-                if self._cache_service:
-                    cache_key = f"books_{user_id}"
-                    self._cache_service.delete(cache_key)
+                self._cache_service.delete(f"books_{user_id}")
                 
                 logger.info(f"Deleted book {book_id} for user {user_id}")
                 return True
@@ -215,9 +204,41 @@ class BookRepository(IBookRepository):
         Returns:
             True si existe, False si no
         """
-        books = self.find_all(user_id)
+        # Compara sobre los diccionarios guardados, sin construir cada Book
         normalized_title = title.lower().strip()
-        return any(book.titulo.lower().strip() == normalized_title for book in books)
+        try:
+            return any(
+                book_data.get("titulo", "").lower().strip() == normalized_title
+                for book_data in self._get_books_data(user_id)
+            )
+        except Exception as e:
+            logger.error(f"Error checking title for user {user_id}: {e}")
+            return False
+    
+    def _get_books_data(self, user_id: str) -> List[dict]:
+        """
+        Método privado para obtener los libros guardados como diccionarios
+        
+        Args:
+            user_id: ID del usuario
+        
+        Returns:
+            Lista de diccionarios de libros
+        """
+        # Intentar obtener del cache primero
+        cache_key = f"books_{user_id}"
+        cached_data = self._cache_service.get(cache_key)
+        if cached_data and "libros_disponibles" in cached_data:
+            logger.info(f"Cache hit for user books: {user_id}")
+            return cached_data["libros_disponibles"]
+        
+        # Si no hay cache, obtener de persistencia
+        user_data = self._get_user_data(user_id)
+        
+        # Guardar en cache (no-op si está deshabilitado)
+        self._cache_service.set(cache_key, user_data, self._cache_ttl)
+        
+        return user_data.get("libros_disponibles", [])
     
     def _get_user_data(self, user_id: str) -> dict:
         """
@@ -2,9 +2,11 @@
 Repositorio para manejo de datos de préstamos
 Aplica el patrón Repository y principios SOLID
 """
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import heapq
 import logging
 
+from adapters.cache_adapter import NullCacheService
 from interfaces.repository_interface import ILoanRepository, IDataAdapter, ICacheService
 from models.loan import Loan, LoanStatus
 from datetime import datetime
@@ -28,10 +30,10 @@ class LoanRepository(ILoanRepository):
         
         Args:
             data_adapter: Adaptador de persistencia
-            cache_service: Servicio de cache opcional
+            cache_service: Servicio de cache opcional (sin él se usa un cache nulo)
         """
         self._data_adapter = data_adapter
-        self._cache_service = cache_service
+        self._cache_service = cache_service if cache_service is not None else NullCacheService()
         self._cache_ttl = 3600  # 1 hora
     
     def find_active_loans(self, user_id: str) -> List[Loan]:
@@ -89,6 +91,41 @@ class LoanRepository(ILoanRepository):
             logger.error(f"Error finding loan history for user {user_id}: {e}")
             return []
     
+    def find_returned_loans(self, user_id: str, limit: Optional[int] = None) -> Tuple[int, List[Loan]]:
+        """
+        Obtiene los préstamos devueltos, del más reciente al más antiguo
+        
+        El filtro y el orden se aplican sobre los diccionarios guardados;
+        solo se construyen objetos Loan para los que se devuelven.
+        
+        Args:
+            user_id: ID del usuario
+            limit: Máximo de préstamos a devolver (None para todos)
+        
+        Returns:
+            Tuple[int, List[Loan]]: (total de devoluciones, préstamos devueltos)
+        """
+        try:
+            user_data = self._get_user_data(user_id)
+            devuelto = LoanStatus.DEVUELTO.value
+            returned = [
+                loan_data for loan_data in user_data.get("historial_prestamos", [])
+                if loan_data.get("estado") == devuelto
+            ]
+            
+            # Fechas ISO: el orden de los strings coincide con el cronológico
+            key = lambda loan_data: loan_data.get("fecha_devolucion") or ""
+            if limit is None:
+                selected = sorted(returned, key=key, reverse=True)
+            else:
+                selected = heapq.nlargest(limit, returned, key=key)
+            
+            return len(returned), [Loan.from_dict(loan_data) for loan_data in selected]
+            
+        except Exception as e:
+            logger.error(f"Error finding returned loans for user {user_id}: {e}")
+            return 0, []
+    
     def find_by_book_id(self, user_id: str, book_id: str) -> Optional[Loan]:
         """
         Busca préstamo activo por ID del libro
@@ -100,8 +137,24 @@ class LoanRepository(ILoanRepository):
         Returns:
             Préstamo encontrado o None
         """
-        active_loans = self.find_active_loans(user_id)
-        return next((loan for loan in active_loans if loan.libro_id == book_id), None)
+        try:
+            # Se busca sobre los diccionarios guardados y solo se construye el préstamo encontrado
+            user_data = self._get_user_data(user_id)
+            loan_data = next(
+                (loan_data for loan_data in user_data.get("prestamos_activos", [])
+                 if loan_data.get("libro_id") == book_id),
+                None
+            )
+            if loan_data is None:
+                return None
+            
+            loan = Loan.from_dict(loan_data)
+            loan.actualizar_estado()
+            return loan
+            
+        except Exception as e:
+            logger.error(f"Error finding loan for book {book_id} of user {user_id}: {e}")
+            return None
     
     def find_by_title(self, user_id: str, title: str) -> Optional[Loan]:
         """
@@ -235,11 +288,9 @@ class LoanRepository(ILoanRepository):
             Diccionario con datos del usuario
         """
         # Intentar cache primero
-        cache_key = f"user_data_{user_id}"
-        if self._cache_service:
-            cached_data = self._cache_service.get(cache_key)
-            if cached_data:
-                return cached_data
+        cached_data = self._cache_service.get(f"user_data_{user_id}")
+        if cached_data:
+            return cached_data
         
         # Obtener estructura inicial por defecto
         initial_data = {
@@ -313,6 +364,4 @@ class LoanRepository(ILoanRepository):
         Args:
             user_id: ID del usuario
         """
-        if self._cache_service:
-            cache_key = f"user_data_{user_id}"
-            self._cache_service.delete(cache_key)
\ No newline at end of file
+        self._cache_service.delete(f"user_data_{user_id}")
\ No newline at end of file
@@ -61,13 +61,16 @@ class LoanService:
         if not book:
             return False, f"No encontré el libro '{book_title or book_id}'", None
         
+        # Una sola lectura de préstamos activos sirve para ambas validaciones
+        active_loans = self._loan_repo.find_active_loans(user_id)
+        loans_by_book = {loan.libro_id: loan for loan in active_loans}
+        
         # Validar que el libro esté disponible
-        existing_loan = self._loan_repo.find_by_book_id(user_id, book.id)
+        existing_loan = loans_by_book.get(book.id)
         if existing_loan and existing_loan.esta_activo():
             return False, f"'{book.titulo}' ya está prestado a {existing_loan.persona}", existing_loan
         
         # Validar límite de préstamos
-        active_loans = self._loan_repo.find_active_loans(user_id)
         if len(active_loans) >= self._max_loans_per_user:
             return False, f"Has alcanzado el límite máximo de {self._max_loans_per_user} préstamos activos", None
         
@@ -166,6 +169,35 @@ class LoanService:
         """
         return self._loan_repo.find_loan_history(user_id)
     
+    def get_active_loans_with_titles(self, user_id: str) -> List[Loan]:
+        """
+        Obtiene los préstamos activos con el título del libro resuelto
+        
+        Los títulos faltantes se completan con una sola lectura del catálogo,
+        sin buscar cada libro por separado.
+        
+        Args:
+            user_id: ID del usuario
+        
+        Returns:
+            Lista de préstamos activos con título
+        """
+        return self._fill_titles(user_id, self.get_active_loans(user_id))
+    
+    def get_returned_loans(self, user_id: str, limit: int = 10) -> Tuple[int, List[Loan]]:
+        """
+        Obtiene los préstamos devueltos más recientes con su título resuelto
+        
+        Args:
+            user_id: ID del usuario
+            limit: Máximo de préstamos a devolver (default 10)
+        
+        Returns:
+            Tuple[int, List[Loan]]: (total de devoluciones, hasta `limit` préstamos más recientes)
+        """
+        total, loans = self._loan_repo.find_returned_loans(user_id, limit)
+        return total, self._fill_titles(user_id, loans)
+    
     def get_overdue_loans(self, user_id: str) -> List[Loan]:
         """
         Obtiene los préstamos vencidos
@@ -245,6 +277,24 @@ class LoanService:
             "overdue_loans": len([l for l in active_loans if l.esta_vencido()])
         }
     
+    def _fill_titles(self, user_id: str, loans: List[Loan]) -> List[Loan]:
+        """
+        Completa en lote los títulos faltantes a partir del catálogo de libros
+        
+        Args:
+            user_id: ID del usuario
+            loans: Préstamos a completar
+        
+        Returns:
+            La misma lista de préstamos
+        """
+        missing = [loan for loan in loans if not loan.titulo]
+        if missing:
+            titles = {book.id: book.titulo for book in self._book_repo.find_all(user_id)}
+            for loan in missing:
+                loan.titulo = titles.get(loan.libro_id, loan.titulo)
+        return loans
+    
     def extend_loan(self, user_id: str, loan_id: str, additional_days: int = 7) -> Tuple[bool, str, Optional[Loan]]:
         """
         Extiende la fecha límite de un préstamo
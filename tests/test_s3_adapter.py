@@ -0,0 +1,119 @@
+"""
+Pruebas de la persistencia write-back de S3DataAdapter
+Se sustituye el adaptador de ask_sdk_s3 por uno en memoria que cuenta los PUT
+"""
+import copy
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from adapters import s3_adapter
+from adapters.s3_adapter import S3DataAdapter
+
+
+BUCKET = "test-bucket"
+
+
+def _envelope(user_id: str = "user-1"):
+    return SimpleNamespace(context=SimpleNamespace(system=SimpleNamespace(user=SimpleNamespace(user_id=user_id))))
+
+
+class _FakeS3:
+    """Adaptador en memoria con el mismo contrato que ask_sdk_s3.adapter.S3Adapter"""
+
+    def __init__(self):
+        self.store = {}
+        self.puts = 0
+        self.fail_next_put = False
+
+    def get_attributes(self, request_envelope):
+        return copy.deepcopy(self.store.get(request_envelope.context.system.user.user_id, {}))
+
+    def save_attributes(self, request_envelope, attributes):
+        if self.fail_next_put:
+            self.fail_next_put = False
+            raise RuntimeError("S3 no disponible")
+        self.puts += 1
+        self.store[request_envelope.context.system.user.user_id] = copy.deepcopy(attributes)
+
+    def delete_attributes(self, request_envelope):
+        self.store.pop(request_envelope.context.system.user.user_id, None)
+
+
+class S3DataAdapterWriteBackTest(unittest.TestCase):
+
+    def setUp(self):
+        self.s3 = _FakeS3()
+        patcher = mock.patch.dict(s3_adapter._S3_ADAPTERS, {BUCKET: self.s3})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.adapter = S3DataAdapter(BUCKET)
+        self.env = _envelope()
+
+    def _add_book(self, titulo: str) -> None:
+        data = self.adapter.get_attributes(self.env)
+        data["libros_disponibles"].append({"titulo": titulo})
+        self.adapter.save_attributes(self.env, data)
+
+    def test_one_put_per_request(self):
+        self._add_book("A")
+        self._add_book("B")
+        self.assertEqual(self.s3.puts, 0)
+
+        self.adapter.flush(self.env)
+        self.assertEqual(self.s3.puts, 1)
+        self.assertEqual([b["titulo"] for b in self.s3.store["user-1"]["libros_disponibles"]], ["A", "B"])
+
+        # Sin cambios nuevos no hay otro PUT
+        self.adapter.flush(self.env)
+        self.assertEqual(self.s3.puts, 1)
+
+    def test_discard_pending_after_exception(self):
+        self._add_book("A")
+        self.adapter.discard_pending(self.env)
+
+        self.assertNotIn("user-1", self.adapter._dirty)
+        self.adapter.flush(self.env)
+        self.assertEqual(self.s3.puts, 0)
+        self.assertNotIn("user-1", self.s3.store)
+
+    def test_failed_put_is_kept_and_retried(self):
+        self._add_book("A")
+        self.s3.fail_next_put = True
+
+        with self.assertRaises(RuntimeError):
+            self.adapter.flush(self.env)
+        self.assertIn("user-1", self.adapter._dirty)
+        self.assertEqual(len(self.adapter.get_attributes(self.env)["libros_disponibles"]), 1)
+
+        self.adapter.flush(self.env)
+        self.assertEqual(self.s3.puts, 1)
+        self.assertNotIn("user-1", self.adapter._dirty)
+        self.assertEqual(len(self.s3.store["user-1"]["libros_disponibles"]), 1)
+
+    def test_reads_are_copies(self):
+        data = self.adapter.get_attributes(self.env)
+        data["libros_disponibles"].append({"titulo": "A medias"})
+        self.assertEqual(self.adapter.get_attributes(self.env)["libros_disponibles"], [])
+
+        self._add_book("A")
+        data = self.adapter.get_attributes(self.env)
+        data["libros_disponibles"].append({"titulo": "A medias"})
+        self.adapter.flush(self.env)
+        self.assertEqual([b["titulo"] for b in self.s3.store["user-1"]["libros_disponibles"]], ["A"])
+
+    def test_read_cache_does_not_outlive_the_request(self):
+        self.adapter.get_attributes(self.env)
+        self.adapter.flush(self.env)
+
+        # Otro contenedor escribe en S3 entre dos turnos
+        self.s3.store["user-1"] = {"libros_disponibles": [{"titulo": "Nuevo"}]}
+        self.assertEqual(self.adapter.get_attributes(self.env)["libros_disponibles"][0]["titulo"], "Nuevo")
+
+        self.s3.store["user-1"] = {"libros_disponibles": []}
+        self.adapter.clear_cache("user-1")
+        self.assertEqual(self.adapter.get_attributes(self.env)["libros_disponibles"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()